@@ -1,17 +1,75 @@
 # audio_streaming_client/main.py
 import asyncio
 import websockets
-import json
+import orjson
 import base64
+import io
 import pyaudio
 import numpy as np
-from collections import deque
-import time
+import struct
+import threading
+
+try:
+    # Opus compression of outgoing chunks; the server decodes Ogg/Opus through PyAV as well
+    import av
+except ImportError:
+    av = None
+
+try:
+    # libuv event loop; faster socket callbacks than the default selector loop
+    import uvloop
+except ImportError:
+    uvloop = None
+
+try:
+    # SIMD base64 (AVX2/NEON where the CPU has it); fuses the encode and the ASCII decode
+    from pybase64 import b64encode_as_string
+except ImportError:
+    def b64encode_as_string(data: bytes) -> str:
+        return base64.b64encode(data).decode('ascii')
+
+# Binary audio frame header understood by /ws/transcribe: type, sample rate, channels
+AUDIO_FRAME_HEADER = struct.Struct("<BHB")
+FRAME_TYPE_AUDIO = 0x01
+
+# Servers that accept this subprotocol take several chunks per frame (type 0x02):
+# a varint chunk count, then each chunk prefixed by its varint length
+AUDIO_BATCH_SUBPROTOCOL = "audio.v3"
+FRAME_TYPE_AUDIO_BATCH = 0x02
+
+# Legacy JSON audio message, split around its base64 "data" value
+AUDIO_MESSAGE_PREFIX = '{"type":"audio_chunk","is_final":false,"task":"transcribe","data":"'
+AUDIO_MESSAGE_SUFFIX = '"}'
+
+
+def encode_varint(value: int) -> bytes:
+    """Unsigned LEB128 encoding used by batched audio frames"""
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
 
 
 class RealTimeAudioStreamer:
-    def __init__(self, websocket_url: str = "ws://localhost:8000/ws/transcribe"):
+    def __init__(
+            self,
+            websocket_url: str = "ws://localhost:8000/ws/transcribe",
+            binary_frames: bool = True,
+            opus: bool = True
+    ):
         self.websocket_url = websocket_url
+        # Raw PCM in binary frames; False falls back to base64 JSON messages for older servers
+        self.binary_frames = binary_frames
+        # Ogg/Opus at ~24 kbps is roughly 8x smaller than 16-bit PCM; needs PyAV
+        self.opus = opus and av is not None
+        self.opus_bitrate = 24000
+        # Set on connect when the server agrees to batched frames
+        self.batching = False
+        # Chunks held back while the socket's write buffer drains
+        self.pending_chunks = []
+        self.write_backlog_limit = 64 * 1024
         self.websocket = None
         self.is_recording = False
         self.is_connected = False
@@ -22,18 +80,36 @@ class RealTimeAudioStreamer:
         self.channels = 1
         self.format = pyaudio.paInt16
         
-        # Buffer for 5-second chunks
-        self.audio_buffer = deque()
+        # Preallocated ring buffer holding the last 5 seconds of samples
         self.buffer_duration = 5  # seconds
         self.samples_per_chunk = self.sample_rate * self.buffer_duration
+        self.ring = np.zeros(self.samples_per_chunk, dtype=np.int16)
+        self.write_idx = 0
+        self.filled = 0
+        self._ring_lock = threading.Lock()  # the PyAudio callback writes from its own thread
+
+        # Set from the audio thread once a full chunk has been captured
+        self._chunk_ready = asyncio.Event()
+        self._samples_since_chunk = 0
+        self._loop = None
         
         self.audio = pyaudio.PyAudio()
         
     async def connect(self):
         """Connect to WebSocket server"""
         try:
-            self.websocket = await websockets.connect(self.websocket_url)
+            # Audio doesn't deflate well, so skip permessage-deflate; allow frames up to 4 MiB
+            self.websocket = await websockets.connect(
+                self.websocket_url,
+                compression=None,
+                max_size=2 ** 22,
+                write_limit=2 ** 20,
+                subprotocols=[AUDIO_BATCH_SUBPROTOCOL]
+            )
+            # Older servers don't pick a subprotocol; keep to one chunk per frame with them
+            self.batching = self.binary_frames and self.websocket.subprotocol == AUDIO_BATCH_SUBPROTOCOL
             self.is_connected = True
+            self._loop = asyncio.get_running_loop()
             print("Connected to WebSocket server")
             return True
         except Exception as e:
@@ -43,14 +119,36 @@ class RealTimeAudioStreamer:
     def audio_callback(self, in_data, frame_count, time_info, status):
         """Callback for audio input - collects 5-second chunks"""
         if self.is_recording:
-            self.audio_buffer.append(in_data)
-            
-            # Keep only last 5 seconds of audio
-            max_chunks = self.samples_per_chunk // self.chunk_size
-            while len(self.audio_buffer) > max_chunks:
-                self.audio_buffer.popleft()
-                
+            samples = np.frombuffer(in_data, dtype=np.int16)
+            with self._ring_lock:
+                self._write_ring(samples)
+
+            self._samples_since_chunk += samples.size
+            if self._samples_since_chunk >= self.samples_per_chunk:
+                self._samples_since_chunk -= self.samples_per_chunk
+                # asyncio primitives aren't thread-safe; wake the sender through its loop
+                self._loop.call_soon_threadsafe(self._chunk_ready.set)
+
         return (in_data, pyaudio.paContinue)
+
+    def _write_ring(self, samples: np.ndarray):
+        """Copy samples into the ring buffer, overwriting the oldest audio"""
+        size = self.ring.size
+        if samples.size >= size:
+            self.ring[:] = samples[-size:]
+            self.write_idx = 0
+            self.filled = size
+            return
+
+        end = self.write_idx + samples.size
+        if end <= size:
+            self.ring[self.write_idx:end] = samples
+        else:
+            first = size - self.write_idx
+            self.ring[self.write_idx:] = samples[:first]
+            self.ring[:end - size] = samples[first:]
+        self.write_idx = end % size
+        self.filled = min(self.filled + samples.size, size)
     
     def start_recording(self):
         """Start recording audio from microphone"""
@@ -83,52 +181,98 @@ class RealTimeAudioStreamer:
                 self.stream.close()
             print("Stopped recording")
     
+    def encode_opus(self, pcm: bytes) -> bytes:
+        """Encode a PCM chunk as a self-contained Ogg/Opus stream"""
+        samples = np.frombuffer(pcm, dtype=np.int16).reshape(1, -1)
+        frame = av.AudioFrame.from_ndarray(samples, format="s16", layout="mono")
+        frame.sample_rate = self.sample_rate
+
+        output = io.BytesIO()
+        with av.open(output, mode="w", format="ogg") as container:
+            stream = container.add_stream("libopus", rate=self.sample_rate, layout="mono")
+            stream.bit_rate = self.opus_bitrate
+            for packet in stream.encode(frame):
+                container.mux(packet)
+            for packet in stream.encode(None):  # flush
+                container.mux(packet)
+
+        return output.getvalue()
+
     def get_audio_chunk(self) -> bytes:
-        """Get 5-second audio chunk from buffer"""
-        if len(self.audio_buffer) > 0:
-            return b''.join(self.audio_buffer)
-        return b""
+        """Get 5-second audio chunk from buffer, oldest sample first"""
+        with self._ring_lock:
+            if self.filled < self.ring.size:
+                # Not wrapped yet: the samples start at index 0
+                return self.ring[:self.filled].tobytes()
+            return np.concatenate((self.ring[self.write_idx:], self.ring[:self.write_idx])).tobytes()
     
+    def build_message(self, audio_chunk: bytes):
+        """Compress and frame one PCM chunk for the wire"""
+        if self.opus:
+            audio_chunk = self.encode_opus(audio_chunk)
+
+        if self.batching:
+            self.pending_chunks.append(audio_chunk)
+            return self.build_batch()
+
+        if self.binary_frames:
+            return AUDIO_FRAME_HEADER.pack(FRAME_TYPE_AUDIO, self.sample_rate, self.channels) + audio_chunk
+
+        # Base64 never needs JSON escaping, so splice it into the pre-serialized envelope.
+        # Sent as text: bytes would be read by the server as a binary audio frame
+        return AUDIO_MESSAGE_PREFIX + b64encode_as_string(audio_chunk) + AUDIO_MESSAGE_SUFFIX
+
+    def build_batch(self):
+        """Frame every pending chunk; a single chunk goes out as a plain audio frame"""
+        chunks, self.pending_chunks = self.pending_chunks, []
+        if len(chunks) == 1:
+            return AUDIO_FRAME_HEADER.pack(FRAME_TYPE_AUDIO, self.sample_rate, self.channels) + chunks[0]
+
+        parts = [AUDIO_FRAME_HEADER.pack(FRAME_TYPE_AUDIO_BATCH, self.sample_rate, self.channels),
+                 encode_varint(len(chunks))]
+        for chunk in chunks:
+            parts.append(encode_varint(len(chunk)))
+            parts.append(chunk)
+        return b"".join(parts)
+
+    def writer_is_backlogged(self) -> bool:
+        return self.websocket.transport.get_write_buffer_size() > self.write_backlog_limit
+
     async def send_audio_chunks(self):
-        """Continuously send 5-second audio chunks"""
-        last_send_time = 0
-        chunk_interval = 5  # seconds
-        
+        """Send a 5-second audio chunk each time the callback reports one is complete"""
         while self.is_connected and self.is_recording:
-            current_time = time.time()
-            
-            # Send chunk every 5 seconds
-            if current_time - last_send_time >= chunk_interval:
-                audio_chunk = self.get_audio_chunk()
-                
-                if len(audio_chunk) > 0:
-                    try:
-                        audio_b64 = base64.b64encode(audio_chunk).decode('utf-8')
-                        
-                        message = {
-                            "type": "audio_chunk",
-                            "data": audio_b64,
-                            "is_final": False,
-                            "task": "transcribe"
-                        }
-                        
-                        await self.websocket.send(json.dumps(message))
-                        print(f"Sent audio chunk: {len(audio_chunk)} bytes")
-                        
-                    except Exception as e:
-                        print(f"Error sending audio: {e}")
-                        self.is_connected = False
-                
-                last_send_time = current_time
-            
-            await asyncio.sleep(0.1)  # Small delay to prevent busy waiting
-    
+            await self._chunk_ready.wait()
+            self._chunk_ready.clear()
+            if not self.is_recording:
+                break
+
+            audio_chunk = self.get_audio_chunk()
+            if not audio_chunk:
+                continue
+
+            try:
+                if self.batching and self.writer_is_backlogged():
+                    # The previous frame is still draining; fold this chunk into the next one
+                    self.pending_chunks.append(
+                        await asyncio.to_thread(self.encode_opus, audio_chunk) if self.opus else audio_chunk
+                    )
+                    continue
+
+                # Opus and base64 are CPU-bound; run them off the loop so receiving isn't stalled
+                message = await asyncio.to_thread(self.build_message, audio_chunk)
+                await self.websocket.send(message)
+                print(f"Sent audio chunk: {len(message)} bytes")
+
+            except Exception as e:
+                print(f"Error sending audio: {e}")
+                self.is_connected = False
+
     async def receive_transcriptions(self):
         """Receive transcriptions from server"""
         while self.is_connected:
             try:
                 response = await self.websocket.recv()
-                data = json.loads(response)
+                data = orjson.loads(response)
                 
                 if data["type"] == "transcription" and data["text"].strip():
                     print(f"\n🎯 TRANSCRIPTION: {data['text']}\n")
@@ -149,30 +293,30 @@ class RealTimeAudioStreamer:
         if not await self.connect():
             return
         
-        # Start receiving transcriptions
-        receive_task = asyncio.create_task(self.receive_transcriptions())
-        
-        # Start recording
-        self.start_recording()
-        
-        # Start sending audio chunks
-        send_task = asyncio.create_task(self.send_audio_chunks())
-        
         try:
-            print(f"Recording for {duration} seconds...")
-            await asyncio.sleep(duration)
-            
+            # Start recording
+            self.start_recording()
+
+            # Both loops live in the group: an error or Ctrl+C in one cancels the other
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self.receive_transcriptions())
+                tg.create_task(self.send_audio_chunks())
+
+                print(f"Recording for {duration} seconds...")
+                await asyncio.sleep(duration)
+
+                # Let both loops finish on their own: wake the sender, close to end the receiver
+                self.stop_recording()
+                self._chunk_ready.set()
+                await self.websocket.close()
+
         except KeyboardInterrupt:
             print("\nInterrupted by user")
         
         finally:
             # Cleanup
             self.stop_recording()
-            send_task.cancel()
-            receive_task.cancel()
-            
-            if self.websocket:
-                await self.websocket.close()
+            await self.websocket.close()
             
             self.audio.terminate()
             print("Client stopped")
@@ -186,6 +330,6 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        asyncio.run(main(), loop_factory=uvloop.new_event_loop if uvloop else None)
     except KeyboardInterrupt:
         print("\nGoodbye!")
@@ -1,7 +1,8 @@
 import os
+from functools import lru_cache
 from pathlib import Path
 
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -15,28 +16,49 @@ class Settings(BaseSettings):
     WHISPER_MODEL_SIZE: str = "base"
     WHISPER_DEVICE: str = "cpu"
     WHISPER_COMPUTE_TYPE: str = "int8"
+    WHISPER_CPU_THREADS: int = 2  # intra-op threads per decode
+    WHISPER_WORKERS: int = 0  # concurrent decodes; 0 picks cpu_count // 2
+
+    # Realtime batching
+    BATCH_MAX_SIZE: int = 8
+    BATCH_MAX_WAIT_MS: int = 50
+    VAD_PREFILTER: bool = True  # skip Whisper on chunks the VAD finds silent
 
     # Audio
     AUDIO_SAMPLE_RATE: int = 16000
     AUDIO_CHUNK_SIZE: int = 1024
     MAX_AUDIO_SIZE_MB: int = 50
+    UPLOAD_SPOOL_MAX_SIZE_KB: int = 256
+    STREAM_BUFFER_MAX_SECONDS: int = 30
 
     BASE_DIR: Path = Path(__file__).resolve().parent.parent
 
-    TEMP_UPLOAD_DIR: str = os.getenv("TEMP_UPLOAD_DIR", str(BASE_DIR / "tmp"))
-    MODEL_CACHE_DIR: str = os.getenv("MODEL_CACHE_DIR", str(BASE_DIR / "models"))
-    LOG_FILE: str = os.getenv("LOG_FILE", str(BASE_DIR / "logs" / "src.log"))
+    # Environment variables of the same name still override these
+    TEMP_UPLOAD_DIR: str = str(BASE_DIR / "tmp")
+    MODEL_CACHE_DIR: str = str(BASE_DIR / "models")
+    LOG_FILE: str = str(BASE_DIR / "logs" / "src.log")
 
     # Logging
     LOG_LEVEL: str = "INFO"
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Build the settings once per process"""
+    return Settings()
+
+
+_ensured_dirs: set = set()
+
 
+def ensure_dirs(settings: Settings):
+    """Create the runtime directories once; called at application startup"""
+    for path in (settings.TEMP_UPLOAD_DIR, settings.MODEL_CACHE_DIR, str(Path(settings.LOG_FILE).parent)):
+        if path not in _ensured_dirs:
+            os.makedirs(path, exist_ok=True)
+            _ensured_dirs.add(path)
 
-settings = Settings()
 
-os.makedirs(settings.TEMP_UPLOAD_DIR, exist_ok=True)
-os.makedirs(settings.MODEL_CACHE_DIR, exist_ok=True)
-os.makedirs(Path(settings.LOG_FILE).parent, exist_ok=True)
+settings = get_settings()
@@ -1,16 +1,40 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+import orjson
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
-from src.core.config import settings
+from starlette.formparsers import MultiPartParser
+from src.core.config import ensure_dirs, settings
+from src.core.logging_config import setup_logging, shutdown_logging
 from src.routes import transcription, websocket
 
+
+# Serialized once; the probe body never changes
+HEALTHY_BODY = orjson.dumps({"status": "healthy", "service": "audio-translation-api"})
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    ensure_dirs(settings)
+    log_listener = setup_logging(settings)
+    try:
+        yield
+    finally:
+        shutdown_logging(log_listener)
+
+
 app = FastAPI(
     title="Audio Translation API",
     description="API for real-time audio transcription and translation",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Roll multipart uploads over to disk early instead of holding them in memory
+MultiPartParser.spool_max_size = settings.UPLOAD_SPOOL_MAX_SIZE_KB * 1024
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -35,7 +59,7 @@ async def read_index():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "audio-translation-api"}
+    return Response(content=HEALTHY_BODY, media_type="application/json")
 
 
 if __name__ == "__main__":
@@ -45,5 +69,6 @@ if __name__ == "__main__":
         "src.main:app",
         host=settings.API_HOST,
         port=settings.API_PORT,
-        reload=settings.API_RELOAD
+        reload=settings.API_RELOAD,
+        ws_per_message_deflate=False  # audio frames don't compress; deflate only costs CPU
     )
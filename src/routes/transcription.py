@@ -1,21 +1,24 @@
-from typing import AsyncGenerator
+import os
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
+import orjson
+from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Response
 
 from src.core.config import settings
 from src.models.schemas import TranscriptionRequest, TranscriptionResponse
 from src.services.transcription_service import transcription_service
-from src.utils.file_handlers import FileHandler
+from src.utils.file_handlers import FileHandler, FileTooLargeError
 
 router = APIRouter()
 
-
-async def chunk_generator(file: UploadFile, chunk_size: int = 1024 * 1024) -> AsyncGenerator[bytes, None]:
-    while True:
-        chunk = await file.read(chunk_size)
-        if not chunk:
-            break
-        yield chunk
+# The health body only depends on whether the model is loaded, so both variants are serialized once
+_HEALTH_BODIES = {
+    loaded: orjson.dumps({
+        "status": "healthy",
+        "service": "audio-translation-api",
+        "model_loaded": loaded
+    })
+    for loaded in (False, True)
+}
 
 
 @router.post("/transcribe/file", response_model=TranscriptionResponse)
@@ -30,17 +33,29 @@ async def transcribe_audio_file(
     if not FileHandler.is_audio_file(file.filename):
         raise HTTPException(400, "File must be an audio file")
 
-    audio_data = await file.read()
     max_size = settings.MAX_AUDIO_SIZE_MB * 1024 * 1024
+    too_large = HTTPException(413, f"File too large. Maximum: {settings.MAX_AUDIO_SIZE_MB}MB")
 
-    if len(audio_data) > max_size:
-        raise HTTPException(413, f"File too large. Maximum: {settings.MAX_AUDIO_SIZE_MB}MB")
+    # The multipart parser already knows the size; reject before copying a byte
+    if file.size is not None and file.size > max_size:
+        raise too_large
 
     file_extension = FileHandler.get_file_extension(file.filename)
+
+    # Stream the upload to disk, still enforcing the limit as bytes arrive when the size is unknown
+    try:
+        temp_path = await FileHandler.save_upload_to_temp(
+            file,
+            destination=settings.TEMP_UPLOAD_DIR,
+            max_size=max_size,
+            suffix=f".{file_extension}"
+        )
+    except FileTooLargeError:
+        raise too_large
+
     try:
-        result = await transcription_service.transcribe_audio_file(
-            audio_data=audio_data,
-            file_extension=file_extension,
+        result = await transcription_service.transcribe_audio_path(
+            audio_path=temp_path,
             task=request.task,
             language=request.language
         )
@@ -49,12 +64,15 @@ async def transcribe_audio_file(
     except Exception as e:
         raise HTTPException(500, f"Transcription error: {str(e)}")
 
+    finally:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+
 
 @router.get("/health")
 async def health_check():
     """API health check"""
-    return {
-        "status": "healthy",
-        "service": "audio-translation-api",
-        "model_loaded": transcription_service.model is not None
-    }
+    return Response(
+        content=_HEALTH_BODIES[transcription_service.model_loaded],
+        media_type="application/json"
+    )
@@ -1,28 +1,54 @@
 # app/api/websocket.py
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-import json
-import base64
 import asyncio
 import logging
-from src.services.transcription_service import transcription_service
+import struct
+
+import numpy as np
+import orjson
+
+from src.services.transcription_service import WHISPER_SAMPLE_RATE, transcription_service
+from src.utils import b64
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Binary audio frames: uint8 frame type, uint16 sample rate, uint8 channels, then raw PCM
+AUDIO_FRAME_HEADER = struct.Struct("<BHB")
+FRAME_TYPE_AUDIO = 0x01
+
+# Clients that negotiate this subprotocol may also send several chunks in one frame:
+# the same header with type 0x02, a varint chunk count, then a varint length before each chunk
+AUDIO_BATCH_SUBPROTOCOL = "audio.v3"
+FRAME_TYPE_AUDIO_BATCH = 0x02
+
+# Keepalive reply, serialized once
+PONG_MESSAGE = orjson.dumps({"type": "pong"}).decode()
+
+# Per-connection conversion buffer, sized for the 5 s chunks the example client sends
+SCRATCH_SAMPLES = 5 * WHISPER_SAMPLE_RATE
+
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: list[WebSocket] = []
+        self.active_connections: set[WebSocket] = set()
+        self.connection_data: dict[WebSocket, dict] = {}
 
     async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info(f"Client connected. Total: {len(self.active_connections)}")
+        batched = AUDIO_BATCH_SUBPROTOCOL in websocket.scope["subprotocols"]
+        await websocket.accept(subprotocol=AUDIO_BATCH_SUBPROTOCOL if batched else None)
+        self.active_connections.add(websocket)
+        self.connection_data[websocket] = {
+            "scratch": np.empty(SCRATCH_SAMPLES, dtype=np.float32),
+            "batched": batched
+        }
+        logger.info("Client connected. Total: %d", len(self.active_connections))
 
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-            logger.info(f"Client disconnected. Total: {len(self.active_connections)}")
+            self.active_connections.discard(websocket)
+            self.connection_data.pop(websocket, None)
+            logger.info("Client disconnected. Total: %d", len(self.active_connections))
         else:
             logger.warning("Attempted to disconnect WebSocket that wasn't in active connections")
 
@@ -30,68 +56,132 @@ class ConnectionManager:
         try:
             await websocket.send_text(message)
         except Exception as e:
-            logger.error(f"Error sending message: {e}")
+            logger.error("Error sending message: %s", e)
             self.disconnect(websocket)
 
 
 manager = ConnectionManager()
 
 
+def _read_varint(view: memoryview, offset: int) -> tuple[int, int]:
+    """Decode an unsigned LEB128 varint, returning (value, next offset)"""
+    value = shift = 0
+    while True:
+        if offset >= len(view):
+            raise ValueError("Truncated varint")
+        byte = view[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def split_audio_batch(payload: memoryview) -> list[memoryview]:
+    """Split a batched frame body into views over its chunks, without copying"""
+    count, offset = _read_varint(payload, 0)
+    chunks = []
+    for _ in range(count):
+        length, offset = _read_varint(payload, offset)
+        if offset + length > len(payload):
+            raise ValueError("Truncated audio batch")
+        chunks.append(payload[offset:offset + length])
+        offset += length
+    return chunks
+
+
+async def audio_chunk_generator(websocket: WebSocket, batched: bool = False):
+    """Yield (audio, sample_rate, channels) for each audio message received on the socket.
+
+    Batched frames are only honoured when the connection negotiated ``audio.v3``.
+    """
+    while True:
+        try:
+            message = await asyncio.wait_for(websocket.receive(), timeout=60.0)
+            if message["type"] == "websocket.disconnect":
+                logger.info("WebSocket disconnected during audio reception")
+                break
+
+            frame = message.get("bytes")
+            if frame is not None:
+                # Binary audio frame: no base64 or JSON on the hot path
+                if len(frame) < AUDIO_FRAME_HEADER.size:
+                    logger.warning("Dropping short binary frame (%d bytes)", len(frame))
+                    continue
+
+                frame_type, sample_rate, channels = AUDIO_FRAME_HEADER.unpack_from(frame, 0)
+                if frame_type == FRAME_TYPE_AUDIO:
+                    yield memoryview(frame)[AUDIO_FRAME_HEADER.size:], sample_rate, channels
+                elif frame_type == FRAME_TYPE_AUDIO_BATCH and batched:
+                    try:
+                        chunks = split_audio_batch(memoryview(frame)[AUDIO_FRAME_HEADER.size:])
+                    except ValueError as e:
+                        logger.warning("Dropping malformed audio batch: %s", e)
+                        continue
+                    for chunk in chunks:
+                        yield chunk, sample_rate, channels
+                continue
+
+            # Text frames carry JSON control messages and legacy base64 audio
+            message = orjson.loads(message["text"])
+
+            if message["type"] == "ping":
+                await websocket.send_text(PONG_MESSAGE)
+            elif message["type"] == "audio_chunk":
+                audio_data = b64.decode(message["data"])
+
+                # Get audio parameters with defaults
+                sample_rate = message.get("sample_rate", 16000)
+                channels = message.get("channels", 1)
+
+                yield audio_data, sample_rate, channels
+
+        except asyncio.TimeoutError:
+            logger.warning("No audio data received for 60 seconds")
+            break
+        except WebSocketDisconnect:
+            logger.info("WebSocket disconnected during audio reception")
+            break
+        except Exception as e:
+            logger.error("Error receiving audio: %s", e)
+            continue
+
+
 @router.websocket("/ws/transcribe")
 async def websocket_transcribe(websocket: WebSocket):
+    loop = asyncio.get_running_loop()
     await manager.connect(websocket)
 
     try:
         await transcription_service.initialize()
         logger.info("Model ready for real-time transcription")
 
-        async def audio_chunk_generator():
-            """Generator for audio chunks"""
-            while True:
-                try:
-                    data = await asyncio.wait_for(websocket.receive_text(), timeout=60.0)
-                    message = json.loads(data)
-
-                    if message["type"] == "audio_chunk":
-                        audio_data = base64.b64decode(message["data"])
-
-                        # Get audio parameters with defaults
-                        sample_rate = message.get("sample_rate", 16000)
-                        channels = message.get("channels", 1)
-
-                        yield audio_data, sample_rate, channels
-
-                except asyncio.TimeoutError:
-                    logger.warning("No audio data received for 60 seconds")
-                    break
-                except WebSocketDisconnect:
-                    logger.info("WebSocket disconnected during audio reception")
-                    break
-                except Exception as e:
-                    logger.error(f"Error receiving audio: {e}")
-                    continue
+        # Chunks are transcribed one at a time, so the connection's scratch buffer can be reused
+        connection = manager.connection_data[websocket]
+        scratch = connection["scratch"]
 
         # Process audio stream in real-time
-        async for audio_data, sample_rate, channels in audio_chunk_generator():
+        async for audio_data, sample_rate, channels in audio_chunk_generator(websocket, connection["batched"]):
             transcription = await transcription_service.transcribe_audio_chunk(
                 audio_data,
                 sample_rate=sample_rate,
-                channels=channels
+                channels=channels,
+                scratch=scratch
             )
 
             if transcription:
                 response = {
                     "type": "transcription",
                     "text": transcription,
-                    "timestamp": asyncio.get_event_loop().time()
+                    "timestamp": loop.time()
                 }
-                await manager.send_personal_message(json.dumps(response), websocket)
-                logger.debug(f"📤 Sent transcription: {transcription}")
+                await manager.send_personal_message(orjson.dumps(response).decode(), websocket)
+                logger.debug("📤 Sent transcription: %s", transcription)
 
     except WebSocketDisconnect:
         logger.info("Client disconnected normally")
     except Exception as e:
-        logger.error(f"WebSocket error: {e}")
+        logger.error("WebSocket error: %s", e)
     finally:
         # Always ensure connection is cleaned up
         manager.disconnect(websocket)
\ No newline at end of file
@@ -0,0 +1,127 @@
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set
+
+
+@dataclass
+class _PendingRequest:
+    key: Hashable
+    item: Any
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class MicroBatcher:
+    """Collect concurrent requests for a short window and run them as one executor call.
+
+    Requests are grouped by ``key`` (e.g. task and language) so only compatible
+    items share a batch. ``process_batch(key, items)`` runs in the executor and
+    must return one result per item, in order. Up to ``max_concurrency`` batches
+    run at once while the next window is already being collected.
+    """
+
+    def __init__(
+            self,
+            process_batch: Callable[[Hashable, List[Any]], List[Any]],
+            max_batch_size: int = 8,
+            max_wait_ms: float = 50,
+            max_concurrency: int = 1
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_concurrency = max_concurrency
+        self.executor = None  # default executor
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._running: Set[asyncio.Task] = set()
+
+        # Metrics
+        self.batches_processed = 0
+        self.items_processed = 0
+        self._total_wait = 0.0
+
+    @property
+    def average_wait_ms(self) -> float:
+        """Mean time a request spent queued before its batch started"""
+        if not self.items_processed:
+            return 0.0
+        return self._total_wait / self.items_processed * 1000
+
+    async def submit(self, key: Hashable, item: Any) -> Any:
+        """Queue an item and wait for its result"""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put(_PendingRequest(key, item, future, self._loop.time()))
+        return await future
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._worker = loop.create_task(self._run())
+
+    async def _collect(self) -> List[_PendingRequest]:
+        """Wait for one request, then gather more until the window closes or the batch is full"""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+
+            groups: Dict[Hashable, List[_PendingRequest]] = defaultdict(list)
+            for request in batch:
+                groups[request.key].append(request)
+
+            for key, requests in groups.items():
+                # Wait for a free slot, then go back to collecting while this batch runs
+                await self._slots.acquire()
+                task = self._loop.create_task(self._process(key, requests))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+    async def _process(self, key: Hashable, requests: List[_PendingRequest]):
+        try:
+            started_at = self._loop.time()
+            self.batches_processed += 1
+            self.items_processed += len(requests)
+            self._total_wait += sum(started_at - r.enqueued_at for r in requests)
+
+            items = [r.item for r in requests]
+            try:
+                results = await self._loop.run_in_executor(
+                    self.executor, self.process_batch, key, items
+                )
+                if len(results) != len(requests):
+                    raise RuntimeError(
+                        f"process_batch returned {len(results)} results for {len(requests)} items"
+                    )
+            except Exception as e:
+                for request in requests:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                return
+
+            for request, result in zip(requests, results):
+                if not request.future.done():
+                    request.future.set_result(result)
+        finally:
+            self._slots.release()
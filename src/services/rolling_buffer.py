@@ -0,0 +1,103 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+def _normalize(word: str) -> str:
+    return word.strip().lower()
+
+
+class RollingAudioBuffer:
+    """Bounded per-session audio buffer with LocalAgreement-2 commit-and-slice.
+
+    Only the uncommitted tail is re-decoded on each tick. A word is committed
+    once two consecutive hypotheses agree on it, and the audio up to its end
+    timestamp is sliced off the buffer.
+    """
+
+    PROMPT_MAX_CHARS = 200
+
+    def __init__(self, sample_rate: int = 16000, max_duration_s: float = 30.0):
+        self.sample_rate = sample_rate
+        self.max_samples = int(max_duration_s * sample_rate)
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.prev_hypothesis: List[str] = []
+        self._pending_words: List[str] = []
+        self.prompt = ""
+
+    def __len__(self) -> int:
+        return self.buffer.size
+
+    @property
+    def duration(self) -> float:
+        """Seconds of uncommitted audio currently held"""
+        return self.buffer.size / self.sample_rate
+
+    def append(self, samples: np.ndarray):
+        """Add new samples, dropping the oldest audio beyond the size bound"""
+        self.buffer = np.concatenate((self.buffer, samples))
+        if self.buffer.size > self.max_samples:
+            self.buffer = self.buffer[-self.max_samples:]
+            # The previous hypothesis described audio that is now gone
+            self._set_pending([])
+
+    def commit(self, words: Sequence) -> str:
+        """Commit the prefix shared with the previous hypothesis and slice its audio off.
+
+        ``words`` are faster-whisper ``Word`` objects (``word``, ``start``, ``end``)
+        with timestamps relative to the start of the buffer.
+        """
+        current = [_normalize(w.word) for w in words]
+
+        agreed = 0
+        for prev, curr in zip(self.prev_hypothesis, current):
+            if prev != curr:
+                break
+            agreed += 1
+
+        if agreed == 0:
+            self._set_pending(words)
+            return ""
+
+        committed = words[:agreed]
+        self._slice(committed[-1].end)
+        self._set_pending(words[agreed:])
+
+        text = "".join(w.word for w in committed).strip()
+        self._remember(text)
+        return text
+
+    def flush(self, words: Optional[Sequence] = None) -> str:
+        """Commit everything in the final hypothesis and empty the buffer.
+
+        Without a final hypothesis (e.g. the last decode failed) the pending,
+        not yet agreed words of the previous hypothesis are emitted instead.
+        """
+        if words is None:
+            text = "".join(self._pending_words).strip()
+        else:
+            text = "".join(w.word for w in words).strip()
+
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self._set_pending([])
+        self._remember(text)
+        return text
+
+    def discard(self):
+        """Drop the buffered audio and hypothesis without committing anything"""
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self._set_pending([])
+
+    def _set_pending(self, words: Sequence):
+        """Remember the uncommitted hypothesis for the next agreement check"""
+        self._pending_words = [w.word for w in words]
+        self.prev_hypothesis = [_normalize(w) for w in self._pending_words]
+
+    def _remember(self, text: str):
+        """Keep the tail of the committed text as decoding context for the next tick"""
+        if text:
+            self.prompt = f"{self.prompt} {text}".strip()[-self.PROMPT_MAX_CHARS:]
+
+    def _slice(self, end_s: float):
+        end_sample = min(int(end_s * self.sample_rate), self.buffer.size)
+        self.buffer = self.buffer[end_sample:]
@@ -1,88 +1,166 @@
 import asyncio
-import io
+import bisect
+import functools
+import logging
 import os
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import AsyncGenerator, Optional
+from typing import TYPE_CHECKING, AsyncGenerator, List, Optional, Tuple, Union
 import numpy as np
-import wave
-
-from faster_whisper import WhisperModel
-from pydub import AudioSegment
-from pydub.generators import Sine
 
 from src.core.config import settings
 from src.models.schemas import TranscriptionResponse
+from src.services.batcher import MicroBatcher
+from src.services.rolling_buffer import RollingAudioBuffer
 from src.utils.audio_converters import AudioConverter
 
+if TYPE_CHECKING:
+    from faster_whisper import BatchedInferencePipeline, WhisperModel
+
+logger = logging.getLogger(__name__)
+
+WHISPER_SAMPLE_RATE = 16000
+MIN_CHUNK_SAMPLES = 160  # 10 ms at 16 kHz, too small to process below this
+MAX_BATCHED_CHUNK_SAMPLES = 30 * WHISPER_SAMPLE_RATE  # one Whisper window per batched clip
+
+REALTIME_VAD_PARAMETERS = dict(
+    threshold=0.3,  # Lower threshold for better detection
+    min_speech_duration_ms=500,
+    max_speech_duration_s=10,
+    min_silence_duration_ms=400
+)
+
+# First four bytes of the container formats accepted as realtime chunks (Opus arrives in Ogg or WebM)
+_MAGICS = frozenset((
+    b'RIFF',  # WAV
+    b'OggS',  # Ogg Vorbis/Opus
+    b'ID3\x02', b'ID3\x03', b'ID3\x04',  # MP3 with ID3v2 tag
+    b'fLaC',  # FLAC
+    b'\x1aE\xdf\xa3',  # WebM/Matroska (EBML), as sent by MediaRecorder
+))
+
+# Realtime decodes are greedy: stability comes from LocalAgreement across
+# consecutive decodes rather than from a beam search within one decode
+REALTIME_DECODE_OPTIONS = dict(beam_size=1, best_of=1, temperature=0.0)
+FILE_DECODE_OPTIONS = dict(beam_size=5, best_of=5)
+
+# Realtime chunks decode with the same settings whether or not they land in a batch
+REALTIME_CHUNK_OPTIONS = dict(
+    without_timestamps=True,
+    no_speech_threshold=0.5,  # Lower threshold to detect more speech
+    **REALTIME_DECODE_OPTIONS
+)
+
+@functools.lru_cache(maxsize=None)
+def _realtime_vad():
+    """Import the Silero VAD on first use; returns (get_speech_timestamps, REALTIME_VAD_PARAMETERS options)"""
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+    return get_speech_timestamps, VadOptions(**REALTIME_VAD_PARAMETERS)
+
+
+def _whisper_workers() -> int:
+    """Concurrent Whisper decodes; by default one per pair of cores"""
+    return settings.WHISPER_WORKERS or max(1, (os.cpu_count() or 2) // 2)
+
 
 class TranscriptionService:
     def __init__(self):
-        self.model: Optional[WhisperModel] = None
+        self.model: Optional["WhisperModel"] = None
+        self.batch_pipeline: Optional["BatchedInferencePipeline"] = None
         self.audio_converter = AudioConverter()
+        # Whisper gets its own threads instead of sharing the default executor with other blocking work
+        self._workers = _whisper_workers()
+        self._pool = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="whisper")
+        self.chunk_batcher = MicroBatcher(
+            self._decode_chunk_batch,
+            max_batch_size=settings.BATCH_MAX_SIZE,
+            max_wait_ms=settings.BATCH_MAX_WAIT_MS,
+            max_concurrency=self._workers  # one batch per pool thread
+        )
+        self.chunk_batcher.executor = self._pool
         self._initialized = False
+        # Flipped once on load so health probes read a flag instead of inspecting the model
+        self._model_loaded = False
+
+    @property
+    def model_loaded(self) -> bool:
+        return self._model_loaded
 
     async def initialize(self):
         """Initialize Whisper model"""
         if self._initialized and self.model is not None:
             return
 
+        # Imported here rather than at module load so the app and /health come up without
+        # faster-whisper; OMP_NUM_THREADS has to be set before ctranslate2 is first imported
+        os.environ.setdefault("OMP_NUM_THREADS", str(settings.WHISPER_CPU_THREADS))
+        from faster_whisper import BatchedInferencePipeline, WhisperModel
+        from faster_whisper.vad import get_vad_model
+
         try:
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             self.model = await loop.run_in_executor(
                 None,
                 lambda: WhisperModel(
                     settings.WHISPER_MODEL_SIZE,
                     device=settings.WHISPER_DEVICE,
                     compute_type=settings.WHISPER_COMPUTE_TYPE,
-                    download_root=settings.MODEL_CACHE_DIR
+                    download_root=settings.MODEL_CACHE_DIR,
+                    cpu_threads=settings.WHISPER_CPU_THREADS,
+                    num_workers=self._workers  # lets every pool thread decode in parallel
                 )
             )
+            self.batch_pipeline = BatchedInferencePipeline(model=self.model)
+            # Load the Silero VAD now rather than on the first chunk
+            await loop.run_in_executor(None, get_vad_model)
             self._initialized = True
-            print(f"Whisper model '{settings.WHISPER_MODEL_SIZE}' loaded successfully!")
+            self._model_loaded = True
+            logger.info("Whisper model '%s' loaded successfully!", settings.WHISPER_MODEL_SIZE)
         except Exception as e:
-            print(f"Error loading Whisper model: {e}")
+            logger.error("Error loading Whisper model: %s", e)
             raise
 
     async def transcribe_audio_file(
             self,
             audio_data: bytes,
-            file_extension: str = "wav",
             task: str = "translate",
             language: Optional[str] = None
     ) -> TranscriptionResponse:
-        """Transcribe complete audio file"""
+        """Transcribe complete audio file held in memory; the container format is probed from the data"""
+        return await self._transcribe_encoded_audio(audio_data, task, language)
+
+    async def transcribe_audio_path(
+            self,
+            audio_path: str,
+            task: str = "translate",
+            language: Optional[str] = None
+    ) -> TranscriptionResponse:
+        """Transcribe an audio file already stored on disk"""
+        return await self._transcribe_encoded_audio(audio_path, task, language)
+
+    async def _transcribe_encoded_audio(
+            self,
+            source: Union[str, bytes],
+            task: str,
+            language: Optional[str]
+    ) -> TranscriptionResponse:
+        """Decode a file path or encoded bytes and transcribe the whole recording"""
         await self.initialize()
 
         # Ensure model is properly initialized
         if self.model is None:
             raise Exception("Whisper model not initialized")
 
-        with tempfile.NamedTemporaryFile(
-                suffix=f".{file_extension}",
-                delete=False,
-                dir=settings.TEMP_UPLOAD_DIR
-        ) as temp_file:
-            temp_file.write(audio_data)
-            temp_path = temp_file.name
-
-        converted_path = None
         try:
-            # Convert audio if necessary
-            converted_path = await self.audio_converter.ensure_compatible_audio(temp_path)
-
-            # Execute transcription in thread pool
-            loop = asyncio.get_event_loop()
-            segments, info = await loop.run_in_executor(
-                None,
-                lambda: self.model.transcribe(
-                    converted_path,
-                    task=task,
-                    language=language,
-                    beam_size=5,
-                    best_of=5,
-                    vad_filter=True
-                )
+            # Decode in-process to mono 16 kHz samples
+            audio = await self.audio_converter.decode_audio(source)
+
+            segments, info = await self.transcribe_async(
+                audio,
+                task=task,
+                language=language,
+                vad_filter=True,
+                **FILE_DECODE_OPTIONS
             )
 
             # Combine all segments into full text
@@ -92,208 +170,320 @@ class TranscriptionService:
                 text=full_text.strip(),
                 language=info.language,
                 confidence=getattr(info, 'language_probability', None),
-                duration=sum(segment.duration for segment in segments),
+                duration=info.duration,
                 processed_at=datetime.now()
             )
 
         except Exception as e:
-            print(f"Error in transcribe_audio_file: {e}")
+            logger.error("Error in transcribe_audio_file: %s", e)
             raise Exception(f"Transcription error: {str(e)}")
 
-        finally:
-            # Cleanup temporary files
-            try:
-                if converted_path and os.path.exists(converted_path) and converted_path != temp_path:
-                    os.unlink(converted_path)
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
-            except Exception as e:
-                print(f"Warning: Error cleaning up temp files: {e}")
-
-    def _raw_audio_to_wav_bytes(self, raw_audio: bytes, sample_rate: int = 16000, channels: int = 1) -> bytes:
-        """Convert raw PCM audio to WAV format bytes"""
-        try:
-            # Create WAV file in memory
-            wav_io = io.BytesIO()
+    async def transcribe_async(self, audio: np.ndarray, **options) -> Tuple[list, object]:
+        """Run a full Whisper decode off the event loop and return (segments, info).
 
-            with wave.open(wav_io, 'wb') as wav_file:
-                wav_file.setnchannels(channels)
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(sample_rate)
-                wav_file.writeframes(raw_audio)
+        faster-whisper yields segments lazily and every segment drives more
+        encoder/decoder work, so the generator is drained in the worker thread;
+        awaiting this coroutine never runs model code on the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, lambda: self._transcribe_sync(audio, **options))
 
-            return wav_io.getvalue()
+    def _transcribe_sync(self, audio: np.ndarray, **options) -> Tuple[list, object]:
+        segments, info = self.model.transcribe(audio, **options)
+        return list(segments), info
 
-        except Exception as e:
-            print(f"Error converting raw audio to WAV: {e}")
-            # Fallback: create synthetic audio for testing
-            return self._create_synthetic_audio()
+    async def _detect_speech(self, audio: np.ndarray) -> Optional[List[dict]]:
+        """Cheap Silero VAD pass finding the speech worth a Whisper decode.
 
-    def _create_synthetic_audio(self, duration_ms: int = 5000) -> bytes:
-        """Create synthetic audio for testing when real audio fails"""
-        try:
-            # Generate a simple sine wave
-            tone = Sine(440).to_audio_segment(duration=duration_ms)
-            tone = tone.set_frame_rate(16000).set_channels(1)
+        Returns the speech regions, so the decode can skip its own VAD pass, or
+        None when the pre-filter is off and the decode has to run VAD itself.
+        """
+        if not settings.VAD_PREFILTER:
+            return None
 
-            wav_io = io.BytesIO()
-            tone.export(wav_io, format="wav")
-            return wav_io.getvalue()
-        except:
-            # Ultimate fallback
-            return b"RIFF\x24\x08\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00\x80>\x00\x00\x00}\x00\x00\x02\x00\x10\x00data\x00\x08\x00\x00"
+        # On the Whisper pool, like the decode it gates
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._speech_timestamps, audio)
+
+    async def _has_speech(self, audio: np.ndarray) -> bool:
+        """Whether audio is worth a Whisper decode"""
+        speech = await self._detect_speech(audio)
+        return speech is None or bool(speech)
+
+    def _raw_audio_to_ndarray(
+            self,
+            raw_audio: Union[bytes, memoryview],
+            sample_rate: int = 16000,
+            channels: int = 1,
+            out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Convert raw 16-bit PCM audio to the mono 16 kHz float32 array Whisper expects.
+
+        When ``out`` is a float32 buffer large enough for the samples, mono 16 kHz
+        audio is converted into it in place and a view of it is returned.
+        """
+        usable = len(raw_audio) - len(raw_audio) % (2 * channels)
+        pcm = np.frombuffer(raw_audio, dtype=np.int16, count=usable // 2)
+
+        if out is not None and channels == 1 and sample_rate == WHISPER_SAMPLE_RATE and pcm.size <= out.size:
+            audio = out[:pcm.size]
+            np.multiply(pcm, np.float32(1 / 32768.0), out=audio, casting='unsafe')
+            return audio
+
+        audio = pcm.astype(np.float32) / 32768.0
+
+        if channels > 1:
+            audio = audio.reshape(-1, channels).mean(axis=1)
+
+        if sample_rate != WHISPER_SAMPLE_RATE and audio.size:
+            # Linear resampling is enough for speech at these rates
+            target_size = int(round(audio.size * WHISPER_SAMPLE_RATE / sample_rate))
+            positions = np.linspace(0, audio.size - 1, num=target_size, dtype=np.float64)
+            audio = np.interp(positions, np.arange(audio.size), audio).astype(np.float32)
+
+        return audio
 
     async def transcribe_audio_chunk(
             self,
-            audio_chunk: bytes,
+            audio_chunk: Union[bytes, memoryview],
             task: str = "transcribe",
             language: Optional[str] = 'pt',
             sample_rate: int = 16000,
-            channels: int = 1
+            channels: int = 1,
+            scratch: Optional[np.ndarray] = None
     ) -> str:
-        """Transcribe a single audio chunk in real-time"""
+        """Transcribe a single audio chunk in real-time.
+
+        ``scratch`` is an optional per-connection float32 buffer reused for the
+        PCM conversion; it must not be shared by chunks decoded concurrently.
+        """
         await self.initialize()
 
         # Ensure model is properly initialized
         if self.model is None:
-            print("❌ Whisper model not initialized")
+            logger.error("❌ Whisper model not initialized")
             return ""
 
         try:
-            # Check if it's raw PCM data or formatted audio
-            is_raw_audio = True
-
-            # Try to detect common audio formats
-            if audio_chunk.startswith(b'RIFF') or audio_chunk.startswith(b'OggS') or audio_chunk.startswith(b'ID3'):
-                is_raw_audio = False
+            # Anything without a known container magic is raw PCM; chunks may be memoryviews over a WebSocket frame
+            is_raw_audio = bytes(memoryview(audio_chunk)[:4]) not in _MAGICS
 
             if is_raw_audio:
-                print(f"Processing raw PCM audio: {len(audio_chunk)} bytes")
-                # Convert raw PCM to WAV
-                wav_data = self._raw_audio_to_wav_bytes(audio_chunk, sample_rate, channels)
+                logger.debug("Processing raw PCM audio: %d bytes", len(audio_chunk))
+                audio = self._raw_audio_to_ndarray(audio_chunk, sample_rate, channels, out=scratch)
             else:
-                print(f"Processing formatted audio: {len(audio_chunk)} bytes")
-                # It's already in a format that can be processed
-                wav_data = audio_chunk
+                logger.debug("Processing formatted audio: %d bytes", len(audio_chunk))
+                # Decode once in memory; the model skips its own decode for arrays
+                audio = await self.audio_converter.decode_audio(bytes(audio_chunk))
 
-            if not wav_data or len(wav_data) < 100:  # Too small to process
+            if audio.size < MIN_CHUNK_SAMPLES:  # Too small to process
                 return ""
 
-            # Use temporary file for transcription
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_file.write(wav_data)
-                temp_path = temp_file.name
-
-            try:
-                # Optimized for real-time transcription
-                loop = asyncio.get_event_loop()
-                segments, info = await loop.run_in_executor(
-                    None,
-                    lambda: self.model.transcribe(
-                        temp_path,
-                        task=task,
-                        language=language,
-                        beam_size=2,
-                        best_of=2,
-                        vad_filter=True,
-                        vad_parameters=dict(
-                            threshold=0.3,  # Lower threshold for better detection
-                            min_speech_duration_ms=500,
-                            max_speech_duration_s=10,
-                            min_silence_duration_ms=400
-                        ),
-                        without_timestamps=True,
-                        no_speech_threshold=0.5  # Lower threshold to detect more speech
-                    )
-                )
-
-                transcription = " ".join(segment.text for segment in segments).strip()
+            # Silent chunks never reach the encoder
+            speech = await self._detect_speech(audio)
+            if speech is not None and not speech:
+                logger.debug("🔇 No speech detected")
+                return ""
 
-                if transcription:
-                    print(f"🎯 Transcription: {transcription}")
-                else:
-                    print("🔇 No speech detected")
+            # Concurrent sessions share one batched decode
+            transcription = await self.chunk_batcher.submit((task, language), (audio, speech))
 
-                return transcription
+            if transcription:
+                logger.debug("🎯 Transcription: %s", transcription)
+            else:
+                logger.debug("🔇 No speech detected")
 
-            finally:
-                if os.path.exists(temp_path):
-                    try:
-                        os.unlink(temp_path)
-                    except:
-                        pass
+            return transcription
 
         except Exception as e:
-            print(f"❌ Error transcribing audio chunk: {e}")
+            logger.error("❌ Error transcribing audio chunk: %s", e)
             return ""
 
+    def _decode_chunk(
+            self,
+            audio: np.ndarray,
+            speech: Optional[List[dict]],
+            task: str,
+            language: Optional[str]
+    ) -> str:
+        """Decode one realtime chunk; runs in the executor.
+
+        With the pre-filter's ``speech`` regions only those samples are decoded,
+        instead of running the VAD a second time inside the model.
+        """
+        if speech is None:
+            vad_options = dict(vad_filter=True, vad_parameters=REALTIME_VAD_PARAMETERS)
+        else:
+            audio = np.concatenate([audio[region["start"]:region["end"]] for region in speech])
+            vad_options = dict(vad_filter=False)
+
+        segments, info = self._transcribe_sync(
+            audio,
+            task=task,
+            language=language,
+            **vad_options,
+            **REALTIME_CHUNK_OPTIONS
+        )
+        return " ".join(segment.text for segment in segments).strip()
+
+    def _speech_timestamps(self, audio: np.ndarray) -> List[dict]:
+        """Speech regions of a chunk in samples, as ``vad_filter`` would find them; runs in the executor"""
+        get_speech_timestamps, vad_options = _realtime_vad()
+        return get_speech_timestamps(audio, vad_options)
+
+    def _decode_chunk_batch(
+            self,
+            key: Tuple[str, Optional[str]],
+            items: List[Tuple[np.ndarray, Optional[List[dict]]]]
+    ) -> List[str]:
+        """Decode (audio, speech) chunks from several sessions in one batched forward pass; runs in the executor"""
+        task, language = key
+        batchable = (
+            len(items) > 1
+            and self.batch_pipeline is not None
+            and language is not None  # a shared tokenizer needs a known language
+            and all(audio.size <= MAX_BATCHED_CHUNK_SAMPLES for audio, _ in items)
+        )
+        if not batchable:
+            return [self._decode_chunk(audio, speech, task, language) for audio, speech in items]
+
+        # Lay the chunks end to end and give each speech region its own clip, so every
+        # clip is one item of the same generate() batch. Clips replace the pipeline's
+        # own VAD, so the regions are the pre-filter's, or found with the same VAD settings
+        chunk_starts, clips, offset = [], [], 0
+        for audio, speech in items:
+            chunk_starts.append(offset / WHISPER_SAMPLE_RATE)
+            for region in speech if speech is not None else self._speech_timestamps(audio):
+                clips.append({
+                    "start": (offset + region["start"]) / WHISPER_SAMPLE_RATE,
+                    "end": (offset + region["end"]) / WHISPER_SAMPLE_RATE
+                })
+            offset += audio.size
+
+        if not clips:
+            return [""] * len(items)
+
+        segments, info = self.batch_pipeline.transcribe(
+            np.concatenate([audio for audio, _ in items]),
+            task=task,
+            language=language,
+            clip_timestamps=clips,
+            batch_size=len(clips),
+            vad_filter=False,
+            **REALTIME_CHUNK_OPTIONS
+        )
+
+        texts = [[] for _ in items]
+        for segment in segments:
+            index = max(bisect.bisect_right(chunk_starts, segment.start + 1e-3) - 1, 0)
+            texts[index].append(segment.text)
+
+        logger.debug("📦 Batched %d chunks in one decode", len(items))
+        return [" ".join(parts).strip() for parts in texts]
+
     async def process_realtime_stream(
             self,
             audio_chunks: AsyncGenerator[bytes, None],
-            chunk_duration: int = 5000,
+            chunk_duration: int = 1000,
             language: Optional[str] = None,
             task: str = "transcribe",
             sample_rate: int = 16000,
             channels: int = 1
     ) -> AsyncGenerator[str, None]:
-        """Process real-time audio stream in chunks"""
+        """Process real-time PCM stream, yielding text once consecutive decodes agree on it"""
         await self.initialize()
 
-        buffer = b""
-        chunk_counter = 0
+        stream_buffer = RollingAudioBuffer(
+            sample_rate=WHISPER_SAMPLE_RATE,
+            max_duration_s=settings.STREAM_BUFFER_MAX_SECONDS
+        )
+        tick_samples = int(chunk_duration / 1000 * WHISPER_SAMPLE_RATE)
+        frame_bytes = 2 * channels
+        leftover = b""
+        pending_samples = 0
+        in_speech = False
 
         async for chunk in audio_chunks:
             if not chunk:
                 continue
 
-            buffer += chunk
+            # Keep partial frames for the next chunk so samples never straddle a boundary
+            data = leftover + chunk
+            usable = len(data) - len(data) % frame_bytes
+            leftover = data[usable:]
 
-            # Calculate approximate duration of buffer
-            buffer_duration = (len(buffer) / (sample_rate * 2)) * 1000  # ms
+            samples = self._raw_audio_to_ndarray(data[:usable], sample_rate, channels)
+            stream_buffer.append(samples)
+            pending_samples += samples.size
 
-            # Process if we have enough audio (approximately 5 seconds)
-            if buffer_duration >= chunk_duration:
-                print(f"🔄 Processing chunk {chunk_counter} ({len(buffer)} bytes, ~{buffer_duration:.0f}ms)")
+            if pending_samples < tick_samples:
+                continue
+            new_samples, pending_samples = pending_samples, 0
+
+            if not await self._has_speech(stream_buffer.buffer[-new_samples:]):
+                if in_speech:
+                    # Speech just finished: commit everything heard so far instead of waiting for agreement
+                    in_speech = False
+                    words = await self._transcribe_words(stream_buffer.buffer, task, language, stream_buffer.prompt)
+                    final_text = stream_buffer.flush(words)
+                    if final_text:
+                        yield final_text
+                else:
+                    # Nothing but silence buffered; don't let long pauses grow the buffer
+                    stream_buffer.discard()
+                continue
+            in_speech = True
 
-                transcription = await self.transcribe_audio_chunk(
-                    buffer, task, language, sample_rate, channels
-                )
+            logger.debug("🔄 Decoding uncommitted tail (~%.0fms)", stream_buffer.duration * 1000)
+            words = await self._transcribe_words(stream_buffer.buffer, task, language, stream_buffer.prompt)
+            if words is None:  # Decode failed; keep the previous hypothesis for the next tick
+                continue
 
-                if transcription and transcription.strip():
-                    yield transcription
-                    chunk_counter += 1
+            committed = stream_buffer.commit(words)
+            if committed:
+                yield committed
 
-                # Reset buffer
-                buffer = b""
+        # Commit whatever is left once the stream ends, including the last unconfirmed words
+        words = None
+        if len(stream_buffer) >= MIN_CHUNK_SAMPLES:
+            logger.debug("🔄 Processing final tail (~%.0fms)", stream_buffer.duration * 1000)
+            words = await self._transcribe_words(stream_buffer.buffer, task, language, stream_buffer.prompt)
 
-        # Process any remaining audio
-        if buffer:
-            final_duration = (len(buffer) / (sample_rate * 2)) * 1000
-            if final_duration >= 1000:  # At least 1 second
-                print(f"🔄 Processing final chunk ({len(buffer)} bytes, ~{final_duration:.0f}ms)")
-                transcription = await self.transcribe_audio_chunk(buffer, task, language, sample_rate, channels)
-                if transcription and transcription.strip():
-                    yield transcription
+        final_text = stream_buffer.flush(words)
+        if final_text:
+            yield final_text
 
-    async def _process_audio_chunk(
+    async def _transcribe_words(
             self,
-            audio_segment: AudioSegment,
-            language: Optional[str],
+            audio: np.ndarray,
             task: str,
-            segment_id: int
-    ) -> str:
-        """Process an individual audio chunk (legacy method)"""
+            language: Optional[str],
+            initial_prompt: Optional[str] = None
+    ) -> Optional[list]:
+        """Decode audio with word timestamps for streaming commit decisions; None if decoding failed"""
+        if self.model is None:
+            return None
+
+        if audio.size < MIN_CHUNK_SAMPLES:
+            return []
+
         try:
-            # Convert to WAV in memory
-            wav_io = io.BytesIO()
-            audio_segment.export(wav_io, format="wav")
-            wav_data = wav_io.getvalue()
+            segments, _ = await self.transcribe_async(
+                audio,
+                task=task,
+                language=language,
+                vad_filter=True,
+                word_timestamps=True,
+                condition_on_previous_text=False,
+                initial_prompt=initial_prompt or None,
+                **REALTIME_DECODE_OPTIONS
+            )
 
-            return await self.transcribe_audio_chunk(wav_data, task, language)
+            return [word for segment in segments for word in (segment.words or [])]
 
         except Exception as e:
-            print(f"Error processing chunk {segment_id}: {e}")
-            return ""
+            logger.error("❌ Error decoding stream buffer: %s", e)
+            return None
 
 
 # Global service instance
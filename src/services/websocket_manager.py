@@ -1,15 +1,19 @@
+import logging
 from datetime import datetime
-from typing import List, Dict
+from typing import Dict, Set
 
+import orjson
 from fastapi import WebSocket
 
 from src.models.schemas import WebSocketMessage
 from src.services.transcription_service import transcription_service
 
+logger = logging.getLogger(__name__)
+
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Set[WebSocket] = set()
         self.connection_data: Dict[WebSocket, Dict] = {}
 
     async def initialize(self):
@@ -18,38 +22,40 @@ class ConnectionManager:
 
     async def cleanup(self):
         """Clean up connections"""
-        for connection in self.active_connections:
+        for connection in list(self.active_connections):
             await connection.close()
         self.active_connections.clear()
         self.connection_data.clear()
 
     async def connect(self, websocket: WebSocket, client_id: str):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
         self.connection_data[websocket] = {
             "client_id": client_id,
             "connected_at": datetime.now()
         }
-        print(f"Client {client_id} connected")
+        logger.info("Client %s connected", client_id)
 
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             client_data = self.connection_data.get(websocket, {})
             client_id = client_data.get("client_id", "Unknown")
-            self.active_connections.remove(websocket)
+            self.active_connections.discard(websocket)
             self.connection_data.pop(websocket, None)
-            print(f"Client {client_id} disconnected")
+            logger.info("Client %s disconnected", client_id)
 
     async def send_message(self, websocket: WebSocket, message: WebSocketMessage):
         try:
-            await websocket.send_json(message.dict())
+            # orjson serializes the timestamp datetime natively
+            await websocket.send_text(orjson.dumps(message.model_dump()).decode())
         except Exception as e:
-            print(f"Error sending message: {e}")
+            logger.error("Error sending message: %s", e)
             self.disconnect(websocket)
 
     async def broadcast(self, message: WebSocketMessage):
         disconnected = []
-        for connection in self.active_connections:
+        # Iterate a snapshot; send_message may disconnect clients mid-loop
+        for connection in list(self.active_connections):
             try:
                 await self.send_message(connection, message)
             except:
@@ -1,79 +1,92 @@
 import asyncio
-import os
+import io
 import subprocess
-import tempfile
+import wave
+from typing import Union
+
+import av
+import numpy as np
+
+TARGET_SAMPLE_RATE = 16000
 
 
 class AudioConverter:
     @staticmethod
-    async def convert_to_wav(audio_data: bytes, input_format: str) -> bytes:
-        """Convert audio to WAV format compatible with Whisper"""
-        # Create temporary input file
-        with tempfile.NamedTemporaryFile(suffix=f".{input_format}", delete=False) as input_file:
-            input_file.write(audio_data)
-            input_path = input_file.name
+    def decode_to_mono16k(source: Union[str, bytes, memoryview]) -> np.ndarray:
+        """Decode audio in-process with PyAV into mono 16 kHz float32 samples"""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
 
-        # Temporary output file
-        output_path = input_path + ".wav"
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=TARGET_SAMPLE_RATE)
+        frames = []
 
-        try:
-            # Convert using ffmpeg
-            cmd = [
-                "ffmpeg", "-i", input_path,
-                "-ac", "1",  # mono
-                "-ar", "16000",  # 16kHz
-                "-acodec", "pcm_s16le",  # 16-bit PCM
-                "-y",  # overwrite file
-                output_path
-            ]
-
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-
-            await process.communicate()
-
-            # Read converted file
-            with open(output_path, "rb") as f:
-                converted_data = f.read()
-
-            return converted_data
-
-        finally:
-            # Clean up temporary files
-            for path in [input_path, output_path]:
-                if os.path.exists(path):
-                    os.unlink(path)
+        with av.open(source) as container:
+            for frame in container.decode(audio=0):
+                for resampled in resampler.resample(frame):
+                    frames.append(resampled.to_ndarray().reshape(-1))
 
-    @staticmethod
-    async def ensure_compatible_audio(file_path: str) -> str:
-        """Ensure audio is in compatible format"""
-        # Check if already WAV with correct specs
-        if file_path.endswith('.wav'):
-            return file_path
+            # Flush samples still buffered in the resampler
+            for resampled in resampler.resample(None):
+                frames.append(resampled.to_ndarray().reshape(-1))
 
-        # Convert if necessary
-        output_path = file_path + ".converted.wav"
+        if not frames:
+            return np.zeros(0, dtype=np.float32)
 
+        return np.concatenate(frames).astype(np.float32) / 32768.0
+
+    @staticmethod
+    async def _decode_with_ffmpeg(source: Union[str, bytes]) -> np.ndarray:
+        """Fallback decode through ffmpeg for codecs PyAV cannot handle"""
+        # Let ffmpeg read paths itself; only in-memory audio is piped through stdin
+        from_path = isinstance(source, str)
         cmd = [
-            "ffmpeg", "-i", file_path,
-            "-ac", "1",
-            "-ar", "16000",
-            "-acodec", "pcm_s16le",
-            "-y",
-            output_path
+            "ffmpeg", "-i", source if from_path else "pipe:0",
+            "-f", "s16le",
+            "-ac", "1",  # mono
+            "-ar", str(TARGET_SAMPLE_RATE),  # 16kHz
+            "-acodec", "pcm_s16le",  # 16-bit PCM
+            "pipe:1"
         ]
 
         process = await asyncio.create_subprocess_exec(
             *cmd,
+            stdin=subprocess.DEVNULL if from_path else subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE
         )
 
-        await process.communicate()
-        return output_path
+        stdout, stderr = await process.communicate(None if from_path else source)
+        if process.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed to decode audio: {stderr.decode(errors='ignore').strip()}")
+
+        return np.frombuffer(stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+    @staticmethod
+    async def decode_audio(source: Union[str, bytes]) -> np.ndarray:
+        """Decode a file path or encoded bytes into Whisper-ready samples"""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, AudioConverter.decode_to_mono16k, source)
+        except av.FFmpegError:
+            return await AudioConverter._decode_with_ffmpeg(source)
+
+    @staticmethod
+    async def convert_to_wav(audio_data: bytes, input_format: str) -> bytes:
+        """Convert audio to WAV format compatible with Whisper.
+
+        input_format is ignored: PyAV probes the container from the data itself.
+        """
+        samples = await AudioConverter.decode_audio(audio_data)
+        pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+
+        wav_io = io.BytesIO()
+        with wave.open(wav_io, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)  # 16-bit
+            wav_file.setframerate(TARGET_SAMPLE_RATE)
+            wav_file.writeframes(pcm.tobytes())
+
+        return wav_io.getvalue()
 
     @staticmethod
     async def convert_audio_chunk(audio_chunk: bytes) -> bytes:
@@ -0,0 +1,24 @@
+import base64
+from typing import Union
+
+try:
+    # libbase64 bindings pick the widest SIMD kernel (AVX2/AVX-512/NEON) at runtime
+    import pybase64
+except ImportError:
+    pybase64 = None
+
+BACKEND = "pybase64" if pybase64 is not None else "stdlib"
+
+
+def encode(data: Union[bytes, memoryview]) -> str:
+    """Base64-encode bytes straight to an ASCII str"""
+    if pybase64 is not None:
+        return pybase64.b64encode_as_string(data)
+    return base64.b64encode(data).decode("ascii")
+
+
+def decode(data: Union[str, bytes]) -> bytes:
+    """Decode a base64 str or bytes payload"""
+    if pybase64 is not None:
+        return pybase64.b64decode(data)
+    return base64.b64decode(data)
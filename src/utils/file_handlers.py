@@ -1,18 +1,61 @@
+import asyncio
 import os
+import shutil
+import tempfile
+from typing import BinaryIO
 
 import aiofiles
 from fastapi import UploadFile
 
+AUDIO_EXTENSIONS = frozenset(('wav', 'mp3', 'm4a', 'ogg', 'flac', 'aac'))
+
+
+class FileTooLargeError(Exception):
+    """Raised when an upload exceeds the allowed size"""
+
+
+def _copy_to_path(source: BinaryIO, file_path: str, chunk_size: int = 1024 * 1024):
+    with open(file_path, 'wb') as out_file:
+        shutil.copyfileobj(source, out_file, length=chunk_size)
+
+
+def _copy_bounded(source: BinaryIO, file_path: str, max_size: int, chunk_size: int):
+    total_size = 0
+    with open(file_path, 'wb') as out_file:
+        while chunk := source.read(chunk_size):
+            total_size += len(chunk)
+            if total_size > max_size:
+                raise FileTooLargeError(f"Upload exceeds {max_size} bytes")
+            out_file.write(chunk)
+
 
 class FileHandler:
     @staticmethod
     async def save_upload_file(upload_file: UploadFile, destination: str) -> str:
         """Save uploaded file"""
         file_path = os.path.join(destination, upload_file.filename)
+        # One thread hop for the whole copy instead of one per aiofiles call
+        await asyncio.to_thread(_copy_to_path, upload_file.file, file_path)
+        return file_path
+
+    @staticmethod
+    async def save_upload_to_temp(
+            upload_file: UploadFile,
+            destination: str,
+            max_size: int,
+            suffix: str = "",
+            chunk_size: int = 1024 * 1024
+    ) -> str:
+        """Stream an upload into a temporary file, aborting once it exceeds max_size"""
+        fd, file_path = tempfile.mkstemp(suffix=suffix, dir=destination)
+        os.close(fd)
 
-        async with aiofiles.open(file_path, 'wb') as out_file:
-            content = await upload_file.read()
-            await out_file.write(content)
+        try:
+            # Copy synchronously in a single worker thread rather than hopping per chunk
+            await asyncio.to_thread(_copy_bounded, upload_file.file, file_path, max_size, chunk_size)
+        except BaseException:
+            os.unlink(file_path)
+            raise
 
         return file_path
 
@@ -29,11 +72,10 @@ class FileHandler:
     @staticmethod
     def get_file_extension(filename: str) -> str:
         """Extract file extension"""
-        return filename.split('.')[-1].lower() if '.' in filename else ''
+        _, dot, extension = filename.rpartition('.')
+        return extension.lower() if dot else ''
 
     @staticmethod
     def is_audio_file(filename: str) -> bool:
         """Check if file is an audio file"""
-        audio_extensions = {'wav', 'mp3', 'm4a', 'ogg', 'flac', 'aac'}
-        extension = FileHandler.get_file_extension(filename)
-        return extension in audio_extensions
+        return FileHandler.get_file_extension(filename) in AUDIO_EXTENSIONS
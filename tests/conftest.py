@@ -0,0 +1,112 @@
+# tests/conftest.py
+import asyncio
+import mmap
+import os
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+SAMPLE_AUDIO_PATH = os.path.join(os.path.dirname(__file__), "data", "teste.ogg")
+
+
+@pytest.fixture(scope="session")
+def ogg_bytes():
+    """Sample OGG file, memory-mapped once per test session instead of copied onto the heap"""
+    if not os.path.exists(SAMPLE_AUDIO_PATH):
+        pytest.skip(f"Audio file not found: {SAMPLE_AUDIO_PATH}")
+
+    with open(SAMPLE_AUDIO_PATH, "rb") as audio_file:
+        mapped = mmap.mmap(audio_file.fileno(), 0, access=mmap.ACCESS_READ)
+    # The mapping outlives the file handle and is unmapped once the last view is collected
+    return memoryview(mapped)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient shared by the whole session; modules that patch the service override it"""
+    from fastapi.testclient import TestClient
+    from src.main import app
+
+    # Not entered as a context manager: WebSocket tests don't need the lifespan's dirs or logging
+    return TestClient(app)
+
+
+class ASGIWebSocket:
+    """In-process WebSocket client that runs the ASGI app as a task on the test's own event loop.
+
+    Unlike TestClient there is no portal thread: messages are handed over through two
+    asyncio queues, so every send/receive is a plain await.
+    """
+
+    def __init__(self, app, path: str, subprotocols=(), timeout: float = 5.0):
+        self.app = app
+        self.path = path
+        self.subprotocols = list(subprotocols)
+        self.timeout = timeout
+        self.accepted_subprotocol = None
+        self._to_app: asyncio.Queue = asyncio.Queue()
+        self._from_app: asyncio.Queue = asyncio.Queue()
+        self._task = None
+
+    async def __aenter__(self):
+        scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "path": self.path,
+            "raw_path": self.path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"testserver")],
+            "client": ("testclient", 50000),
+            "server": ("testserver", 80),
+            "subprotocols": self.subprotocols,
+            "state": {},
+        }
+        self._task = asyncio.create_task(self._run(scope))
+        await self._to_app.put({"type": "websocket.connect"})
+
+        message = await self._receive(self.timeout)
+        self.accepted_subprotocol = message.get("subprotocol")
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._to_app.put({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(self._task, self.timeout)
+
+    async def _run(self, scope):
+        try:
+            await self.app(scope, self._to_app.get, self._from_app.put)
+        except Exception as e:
+            await self._from_app.put({"type": "test.error", "error": e})
+        else:
+            await self._from_app.put({"type": "websocket.close", "code": 1000})
+
+    async def _receive(self, timeout):
+        message = await asyncio.wait_for(self._from_app.get(), timeout)
+        if message["type"] == "test.error":
+            raise message["error"]
+        if message["type"] == "websocket.close":
+            raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+        return message
+
+    async def send_text(self, data: str):
+        await self._to_app.put({"type": "websocket.receive", "text": data})
+
+    async def send_bytes(self, data: bytes):
+        await self._to_app.put({"type": "websocket.receive", "bytes": data})
+
+    async def receive_text(self, timeout: float = None) -> str:
+        message = await self._receive(self.timeout if timeout is None else timeout)
+        return message["text"]
+
+
+@pytest.fixture
+def ws_connect():
+    """Open in-process WebSocket connections to the app: ``async with ws_connect(path) as ws``"""
+    from src.main import app
+
+    def connect(path: str, subprotocols=()):
+        return ASGIWebSocket(app, path, subprotocols)
+
+    return connect
@@ -0,0 +1,110 @@
+# tests/test_audio_converters.py
+import io
+import os
+import wave
+
+import av
+import numpy as np
+import pytest
+
+from src.utils.audio_converters import AudioConverter
+
+AUDIO_PATH = os.path.join(os.path.dirname(__file__), "data", "teste.ogg")
+
+
+def test_decode_to_mono16k_from_path():
+    audio = AudioConverter.decode_to_mono16k(AUDIO_PATH)
+
+    assert audio.dtype == np.float32
+    assert audio.ndim == 1
+    assert audio.size > 16000  # sample is longer than one second
+    assert np.abs(audio).max() <= 1.0
+
+
+def test_decode_to_mono16k_from_bytes_matches_path(ogg_bytes):
+    from_bytes = AudioConverter.decode_to_mono16k(ogg_bytes)
+    from_path = AudioConverter.decode_to_mono16k(AUDIO_PATH)
+
+    np.testing.assert_array_equal(from_bytes, from_path)
+
+
+@pytest.mark.asyncio
+async def test_convert_to_wav(ogg_bytes):
+    wav_data = await AudioConverter.convert_to_wav(ogg_bytes, "ogg")
+
+    with wave.open(io.BytesIO(wav_data), "rb") as wav_file:
+        assert wav_file.getnchannels() == 1
+        assert wav_file.getsampwidth() == 2
+        assert wav_file.getframerate() == 16000
+        assert wav_file.getnframes() > 16000
+
+
+class FakeProcess:
+    """Stands in for the ffmpeg child process"""
+
+    def __init__(self, stdout=b"", returncode=0):
+        self.stdout = stdout
+        self.returncode = returncode
+        self.stdin_data = None
+
+    async def communicate(self, stdin_data=None):
+        self.stdin_data = stdin_data
+        return self.stdout, b"ffmpeg said no"
+
+
+@pytest.fixture
+def pyav_fails(monkeypatch):
+    """Force PyAV to reject the input so the ffmpeg fallback runs"""
+
+    def failing_decode(source):
+        raise av.InvalidDataError(1094995529, "Invalid data found when processing input")
+
+    monkeypatch.setattr(AudioConverter, "decode_to_mono16k", staticmethod(failing_decode))
+
+
+@pytest.fixture
+def fake_ffmpeg(monkeypatch):
+    """Capture ffmpeg invocations instead of spawning a process"""
+    calls = []
+    process = FakeProcess(stdout=np.array([0, 16384], dtype=np.int16).tobytes())
+
+    async def fake_exec(*cmd, **kwargs):
+        calls.append((cmd, kwargs))
+        return process
+
+    monkeypatch.setattr("asyncio.create_subprocess_exec", fake_exec)
+    return calls, process
+
+
+@pytest.mark.asyncio
+async def test_decode_audio_falls_back_to_ffmpeg_for_path(pyav_fails, fake_ffmpeg):
+    calls, process = fake_ffmpeg
+
+    audio = await AudioConverter.decode_audio(AUDIO_PATH)
+
+    np.testing.assert_allclose(audio, [0.0, 0.5])
+    cmd, kwargs = calls[0]
+    assert cmd[:3] == ("ffmpeg", "-i", AUDIO_PATH)  # file is read by ffmpeg, not by us
+    assert process.stdin_data is None
+
+
+@pytest.mark.asyncio
+async def test_decode_audio_falls_back_to_ffmpeg_for_bytes(pyav_fails, fake_ffmpeg, ogg_bytes):
+    calls, process = fake_ffmpeg
+
+    await AudioConverter.decode_audio(ogg_bytes)
+
+    cmd, _ = calls[0]
+    assert cmd[:3] == ("ffmpeg", "-i", "pipe:0")
+    assert process.stdin_data == ogg_bytes
+
+
+@pytest.mark.asyncio
+async def test_decode_audio_ffmpeg_failure(pyav_fails, monkeypatch):
+    async def fake_exec(*cmd, **kwargs):
+        return FakeProcess(returncode=1)
+
+    monkeypatch.setattr("asyncio.create_subprocess_exec", fake_exec)
+
+    with pytest.raises(RuntimeError, match="ffmpeg said no"):
+        await AudioConverter.decode_audio(AUDIO_PATH)
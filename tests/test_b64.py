@@ -0,0 +1,19 @@
+# tests/test_b64.py
+import base64
+
+import pytest
+
+from src.utils import b64
+
+
+@pytest.mark.parametrize("data", [b"", b"a", b"\x00\xff" * 3000])
+def test_encode_matches_stdlib(data):
+    assert b64.encode(data) == base64.b64encode(data).decode("ascii")
+
+
+def test_decode_round_trips_str_and_bytes():
+    payload = bytes(range(256)) * 20
+    encoded = b64.encode(payload)
+
+    assert b64.decode(encoded) == payload
+    assert b64.decode(encoded.encode("ascii")) == payload
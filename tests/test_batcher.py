@@ -0,0 +1,91 @@
+# tests/test_batcher.py
+import asyncio
+import threading
+
+import pytest
+
+from src.services.batcher import MicroBatcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_batch():
+    batches = []
+
+    def process(key, items):
+        batches.append((key, list(items)))
+        return [item * 10 for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=8, max_wait_ms=20)
+
+    results = await asyncio.gather(*(batcher.submit("pt", i) for i in range(4)))
+
+    assert results == [0, 10, 20, 30]
+    assert batches == [("pt", [0, 1, 2, 3])]
+    assert batcher.batches_processed == 1
+    assert batcher.items_processed == 4
+    assert batcher.average_wait_ms >= 0
+
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_and_grouped_by_key():
+    batches = []
+
+    def process(key, items):
+        batches.append((key, list(items)))
+        return items
+
+    batcher = MicroBatcher(process, max_batch_size=3, max_wait_ms=20)
+
+    keys = ["pt", "en", "pt", "pt", "pt"]
+    results = await asyncio.gather(*(batcher.submit(key, i) for i, key in enumerate(keys)))
+
+    assert results == [0, 1, 2, 3, 4]
+    assert len(batches) == 3
+    assert ("en", [1]) in batches
+    assert all(len(items) <= 3 for _, items in batches)
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_request_in_the_batch():
+    def process(key, items):
+        raise RuntimeError("decoder failed")
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=20)
+
+    results = await asyncio.gather(
+        batcher.submit("pt", 1), batcher.submit("pt", 2), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    # The worker keeps serving after a failed batch
+    batcher.process_batch = lambda key, items: items
+    assert await batcher.submit("pt", 3) == 3
+
+
+@pytest.mark.asyncio
+async def test_batches_of_different_keys_decode_in_parallel():
+    # Each batch waits until the other one is running too
+    both_running = threading.Barrier(2, timeout=5)
+
+    def process(key, items):
+        both_running.wait()
+        return items
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=20, max_concurrency=2)
+
+    results = await asyncio.gather(batcher.submit("pt", 1), batcher.submit("en", 2))
+
+    assert results == [1, 2]
+    assert batcher.batches_processed == 2
+
+
+@pytest.mark.asyncio
+async def test_short_result_lists_fail_the_batch():
+    batcher = MicroBatcher(lambda key, items: items[:1], max_batch_size=4, max_wait_ms=20)
+
+    results = await asyncio.gather(
+        batcher.submit("pt", 1), batcher.submit("pt", 2), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,57 @@
+# tests/test_file_handlers.py
+import io
+
+import pytest
+from fastapi import UploadFile
+
+from src.utils.file_handlers import FileHandler, FileTooLargeError
+
+
+@pytest.mark.asyncio
+async def test_save_upload_to_temp_streams_to_disk(tmp_path):
+    upload = UploadFile(io.BytesIO(b"RIFF" + b"\x00" * 100), filename="audio.wav")
+
+    path = await FileHandler.save_upload_to_temp(upload, str(tmp_path), max_size=1024, suffix=".wav", chunk_size=16)
+
+    assert path.endswith(".wav")
+    with open(path, "rb") as saved:
+        assert saved.read() == b"RIFF" + b"\x00" * 100
+
+
+@pytest.mark.asyncio
+async def test_save_upload_to_temp_aborts_past_the_limit(tmp_path):
+    # No known size, so the limit can only be enforced while streaming
+    upload = UploadFile(io.BytesIO(b"X" * 4096), filename="audio.wav")
+
+    with pytest.raises(FileTooLargeError):
+        await FileHandler.save_upload_to_temp(upload, str(tmp_path), max_size=1024, chunk_size=256)
+
+    # Partially written upload must be removed
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("filename, extension", [
+    ("audio.OGG", "ogg"),
+    ("archive.tar.gz", "gz"),
+    ("no_extension", ""),
+    ("trailing.", ""),
+])
+def test_get_file_extension(filename, extension):
+    assert FileHandler.get_file_extension(filename) == extension
+
+
+def test_is_audio_file():
+    assert FileHandler.is_audio_file("voice.m4a")
+    assert not FileHandler.is_audio_file("notes.txt")
+    assert not FileHandler.is_audio_file("wav")
+
+
+@pytest.mark.asyncio
+async def test_save_upload_file_copies_whole_upload(tmp_path):
+    upload = UploadFile(io.BytesIO(b"OggS" + b"\x01" * 2048), filename="clip.ogg")
+
+    path = await FileHandler.save_upload_file(upload, str(tmp_path))
+
+    assert path == str(tmp_path / "clip.ogg")
+    with open(path, "rb") as saved:
+        assert saved.read() == b"OggS" + b"\x01" * 2048
@@ -0,0 +1,26 @@
+# tests/test_logging_config.py
+import logging
+from types import SimpleNamespace
+
+from src.core.logging_config import setup_logging, shutdown_logging
+
+
+def test_records_reach_the_log_file_through_the_queue(tmp_path):
+    log_file = tmp_path / "app.log"
+    settings = SimpleNamespace(LOG_FILE=str(log_file), LOG_LEVEL="INFO")
+    root = logging.getLogger()
+    handlers_before = list(root.handlers)
+    level_before = root.level
+
+    listener = setup_logging(settings)
+    try:
+        logging.getLogger("src.test").info("Client %s connected", "abc")
+        logging.getLogger("src.test").debug("hidden at INFO")
+    finally:
+        shutdown_logging(listener)
+        root.setLevel(level_before)
+
+    contents = log_file.read_text(encoding="utf-8")
+    assert "Client abc connected" in contents
+    assert "hidden at INFO" not in contents
+    assert root.handlers == handlers_before
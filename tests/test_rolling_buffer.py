@@ -0,0 +1,91 @@
+# tests/test_rolling_buffer.py
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.services.rolling_buffer import RollingAudioBuffer
+
+
+def make_words(*spec):
+    """Build faster-whisper-like words from (text, start, end) tuples"""
+    return [SimpleNamespace(word=text, start=start, end=end) for text, start, end in spec]
+
+
+def test_append_enforces_max_duration():
+    buffer = RollingAudioBuffer(sample_rate=10, max_duration_s=2)
+
+    buffer.append(np.arange(15, dtype=np.float32))
+    buffer.append(np.arange(15, 30, dtype=np.float32))
+
+    assert len(buffer) == 20
+    assert buffer.buffer[0] == 10  # oldest samples dropped first
+
+
+def test_commit_requires_two_agreeing_hypotheses():
+    buffer = RollingAudioBuffer(sample_rate=10)
+    buffer.append(np.zeros(30, dtype=np.float32))
+
+    first = buffer.commit(make_words((" Olá", 0.0, 0.5), (" mundo", 0.5, 1.0)))
+    assert first == ""
+    assert len(buffer) == 30
+
+    second = buffer.commit(make_words((" Olá", 0.0, 0.5), (" mundo", 0.5, 1.1), (" novo", 1.1, 1.5)))
+    assert second == "Olá mundo"
+    assert len(buffer) == 30 - 11  # sliced at the end of the last committed word
+    assert buffer.prev_hypothesis == ["novo"]
+    assert buffer.prompt == "Olá mundo"
+
+
+def test_commit_stops_at_first_disagreement():
+    buffer = RollingAudioBuffer(sample_rate=10)
+    buffer.append(np.zeros(30, dtype=np.float32))
+
+    buffer.commit(make_words((" um", 0.0, 0.4), (" dois", 0.4, 0.8)))
+    text = buffer.commit(make_words((" um", 0.0, 0.4), (" três", 0.4, 0.8)))
+
+    assert text == "um"
+    assert buffer.prev_hypothesis == ["três"]
+
+
+def test_flush_commits_everything():
+    buffer = RollingAudioBuffer(sample_rate=10)
+    buffer.append(np.zeros(30, dtype=np.float32))
+
+    text = buffer.flush(make_words((" fim", 0.0, 0.5)))
+
+    assert text == "fim"
+    assert len(buffer) == 0
+
+
+def test_trimming_front_audio_resets_previous_hypothesis():
+    buffer = RollingAudioBuffer(sample_rate=10, max_duration_s=2)
+    buffer.append(np.zeros(15, dtype=np.float32))
+    buffer.commit(make_words((" Olá", 0.0, 0.5)))
+
+    buffer.append(np.zeros(10, dtype=np.float32))  # pushes the oldest 5 samples out
+
+    assert buffer.prev_hypothesis == []
+    # The re-decoded word no longer agrees with audio that was dropped
+    assert buffer.commit(make_words((" Olá", 0.0, 0.5))) == ""
+
+
+def test_flush_without_hypothesis_emits_pending_words():
+    buffer = RollingAudioBuffer(sample_rate=10)
+    buffer.append(np.zeros(30, dtype=np.float32))
+    buffer.commit(make_words((" Olá", 0.0, 0.5), (" Mundo", 0.5, 1.0)))
+
+    assert buffer.flush() == "Olá Mundo"
+    assert len(buffer) == 0
+    assert buffer.prev_hypothesis == []
+
+
+def test_discard_drops_audio_and_hypothesis():
+    buffer = RollingAudioBuffer(sample_rate=10)
+    buffer.append(np.zeros(30, dtype=np.float32))
+    buffer.commit(make_words((" Olá", 0.0, 0.5)))
+
+    buffer.discard()
+
+    assert len(buffer) == 0
+    assert buffer.flush() == ""
+    assert buffer.prompt == ""
@@ -1,49 +1,109 @@
 import io
-import json
-import base64
 import os
+from contextlib import contextmanager
 from datetime import datetime
 from unittest.mock import patch, AsyncMock
 
+import httpx
+import orjson
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 from starlette.websockets import WebSocketDisconnect
 
+from src.core.config import settings
 from src.main import app
 from src.models.schemas import TranscriptionResponse
 from src.services.transcription_service import transcription_service
+from src.utils import b64
 
 
-@pytest.fixture
-def client(monkeypatch):
-    transcription_service.model = object()
+# Payloads shared across tests, built once at import
+_TWO_MB = 2 * 1024 * 1024  # twice the 1MB limit the size tests set
+_RIFF_B64 = b64.encode(b"RIFF" + b"00" * 10)
+_PROCESSED_AT = datetime(2024, 1, 1)  # fixed so responses are deterministic
+
+
+class _BigUpload:
+    """File-like upload that streams ``size`` bytes out of one shared page instead of a full buffer"""
+    # Plain bytes: the ASGI body must be bytes, and a full-length slice returns the page itself
+    _PAGE = b"X" * 64 * 1024
+
+    def __init__(self, size: int):
+        self.remaining = size
+
+    def read(self, n: int = -1):
+        n = len(self._PAGE) if n < 0 else min(n, len(self._PAGE))
+        n = min(n, self.remaining)
+        self.remaining -= n
+        return self._PAGE[:n]
+
+
+@contextmanager
+def service_fakes(log_dir):
+    """Scoped patches on the service singleton and the log file; no model is ever touched"""
 
     async def fake_initialize():
-        transcription_service.model = object()
+        pass
 
-    async def fake_transcribe_audio_chunk(audio_chunk: bytes, task="transcribe", language=None, sample_rate=16000, channels=1):
+    async def fake_transcribe_audio_chunk(audio_chunk: bytes, task="transcribe", language=None, sample_rate=16000, channels=1, scratch=None):
         return "mocked transcription"
 
     async def fake_process_realtime_stream(audio_stream, chunk_duration=5000, language=None, task="transcribe", sample_rate=16000, channels=1):
         yield "mocked stream transcription"
 
-    monkeypatch.setattr(transcription_service, "initialize", fake_initialize)
-    monkeypatch.setattr(transcription_service, "transcribe_audio_chunk", fake_transcribe_audio_chunk)
-    monkeypatch.setattr(transcription_service, "process_realtime_stream", fake_process_realtime_stream)
+    fakes = patch.multiple(
+        transcription_service,
+        _model_loaded=True,
+        initialize=fake_initialize,
+        transcribe_audio_chunk=fake_transcribe_audio_chunk,
+        process_realtime_stream=fake_process_realtime_stream
+    )
+    # Keep the app's log file out of the source tree
+    log_file = patch.object(settings, "LOG_FILE", str(log_dir / "test.log"))
 
-    return TestClient(app)
+    with fakes, log_file:
+        yield
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    """Blocking client for the WebSocket test; entering it runs the app lifespan"""
+    with service_fakes(tmp_path_factory.mktemp("logs")), TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest_asyncio.fixture
+async def http_client(tmp_path_factory):
+    """In-process async HTTP client; the app lifespan runs on the test's own loop, with no portal thread"""
+    with service_fakes(tmp_path_factory.mktemp("logs")):
+        # The lifespan creates the upload directory and the logging queue
+        async with app.router.lifespan_context(app), httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as async_client:
+            yield async_client
 
 
 # ---------------------- HTTP ROUTES ----------------------
 
-def test_health_check(client):
-    res = client.get("/api/v1/health")
+@pytest.mark.asyncio
+async def test_health_check(http_client):
+    res = await http_client.get("/api/v1/health")
     assert res.status_code == 200
     data = res.json()
-    assert "model_loaded" in data
+    assert data["model_loaded"] is True
+
+
+@pytest.mark.asyncio
+async def test_root_health_check(http_client):
+    res = await http_client.get("/health")
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/json"
+    assert res.json() == {"status": "healthy", "service": "audio-translation-api"}
 
 
-def test_transcribe_file_success(client):
+@pytest.mark.asyncio
+async def test_transcribe_file_success(http_client):
     """Test successful file transcription with proper mocking"""
 
     # Mock the entire transcription service
@@ -54,11 +114,20 @@ def test_transcribe_file_success(client):
             language="en",
             confidence=0.95,
             duration=3.0,
-            processed_at=datetime.now()
+            processed_at=_PROCESSED_AT
         )
 
-        # Mock the transcribe_audio_file method
-        mock_service.transcribe_audio_file = AsyncMock(return_value=mock_response)
+        # Fake transcribe_audio_path, recording its calls and what was streamed to disk
+        calls = []
+        uploaded = {}
+
+        async def fake_transcribe_audio_path(**kwargs):
+            calls.append(kwargs)
+            with open(kwargs["audio_path"], "rb") as f:
+                uploaded["data"] = f.read()
+            return mock_response
+
+        mock_service.transcribe_audio_path = fake_transcribe_audio_path
 
         # Prepare test data
         audio_bytes = b"fake_audio_data"
@@ -67,7 +136,7 @@ def test_transcribe_file_success(client):
         }
 
         # Make the request
-        response = client.post("/api/v1/transcribe/file", files=files)
+        response = await http_client.post("/api/v1/transcribe/file", files=files)
 
         # Assertions
         assert response.status_code == 200
@@ -76,17 +145,20 @@ def test_transcribe_file_success(client):
         assert data["language"] == "en"
         assert data["confidence"] == 0.95
         assert data["duration"] == 3.0
-        assert "processed_at" in data
+        assert data["processed_at"] == _PROCESSED_AT.isoformat()
 
         # Verify the service was called with correct parameters
-        mock_service.transcribe_audio_file.assert_called_once()
-        call_args = mock_service.transcribe_audio_file.call_args
-        assert call_args[1]['audio_data'] == audio_bytes
-        assert call_args[1]['file_extension'] == 'ogg'
-        assert call_args[1]['task'] == 'transcribe'  # default value
+        assert len(calls) == 1
+        assert uploaded["data"] == audio_bytes
+        assert calls[0]['audio_path'].endswith('.ogg')
+        assert calls[0]['task'] == 'transcribe'  # default value
 
+        # Temporary upload should be removed after the request
+        assert not os.path.exists(calls[0]['audio_path'])
 
-def test_transcribe_file_with_custom_parameters(client):
+
+@pytest.mark.asyncio
+async def test_transcribe_file_with_custom_parameters(http_client):
     """Test transcription with custom task and language"""
 
     with patch('src.routes.transcription.transcription_service') as mock_service:
@@ -95,10 +167,10 @@ def test_transcribe_file_with_custom_parameters(client):
             language="pt",
             confidence=0.92,
             duration=2.5,
-            processed_at=datetime.now()
+            processed_at=_PROCESSED_AT
         )
 
-        mock_service.transcribe_audio_file = AsyncMock(return_value=mock_response)
+        mock_service.transcribe_audio_path = AsyncMock(return_value=mock_response)
 
         audio_bytes = b"fake_audio_data"
         files = {"file": ("test.ogg", audio_bytes, "audio/ogg")}
@@ -107,7 +179,7 @@ def test_transcribe_file_with_custom_parameters(client):
             "language": "pt"
         }
 
-        response = client.post("/api/v1/transcribe/file", files=files, data=data)
+        response = await http_client.post("/api/v1/transcribe/file", files=files, data=data)
 
         assert response.status_code == 200
         data = response.json()
@@ -115,74 +187,102 @@ def test_transcribe_file_with_custom_parameters(client):
         assert data["language"] == "pt"
 
         # Verify custom parameters were passed
-        call_args = mock_service.transcribe_audio_file.call_args
+        call_args = mock_service.transcribe_audio_path.call_args
         assert call_args[1]['task'] == 'transcribe'
 
 
-def test_transcribe_file_no_file_uploaded(client):
+@pytest.mark.asyncio
+async def test_transcribe_file_no_file_uploaded(http_client):
     """Test when no file is uploaded"""
 
     with patch('src.routes.transcription.transcription_service') as mock_service:
-        mock_service.transcribe_audio_file = AsyncMock()
+        mock_service.transcribe_audio_path = AsyncMock()
 
-        response = client.post("/api/v1/transcribe/file")
+        response = await http_client.post("/api/v1/transcribe/file")
 
         # FastAPI returns 422 for validation errors
         assert response.status_code == 422
-        mock_service.transcribe_audio_file.assert_not_called()
+        mock_service.transcribe_audio_path.assert_not_called()
 
 
-def test_transcribe_file_invalid_extension(client):
+@pytest.mark.asyncio
+async def test_transcribe_file_invalid_extension(http_client):
     fake = io.BytesIO(b"not audio")
-    response = client.post(
+    response = await http_client.post(
         "/api/v1/transcribe/file",
         files={"file": ("file.txt", fake, "text/plain")}
     )
     assert response.status_code == 400
 
 
-def test_transcribe_file_too_large(client, monkeypatch):
+@pytest.mark.asyncio
+async def test_transcribe_file_too_large(http_client, monkeypatch, tmp_path):
     monkeypatch.setattr("src.core.config.settings.MAX_AUDIO_SIZE_MB", 1)
-    big_file = io.BytesIO(b"X" * (2 * 1024 * 1024))  # 2MB
-    response = client.post(
+    monkeypatch.setattr("src.core.config.settings.TEMP_UPLOAD_DIR", str(tmp_path))
+    big_file = _BigUpload(_TWO_MB)
+    response = await http_client.post(
         "/api/v1/transcribe/file",
         files={"file": ("audio.wav", big_file, "audio/wav")}
     )
     assert response.status_code == 413
+    # Rejected from the parsed size, before anything is written
+    assert list(tmp_path.iterdir()) == []
+
 
+@pytest.mark.asyncio
+async def test_transcribe_file_too_large_skips_the_copy(http_client, monkeypatch):
+    monkeypatch.setattr("src.core.config.settings.MAX_AUDIO_SIZE_MB", 1)
+    saved = []
+
+    async def fake_save(*args, **kwargs):
+        saved.append(args)
+        raise AssertionError("oversized upload should not be copied")
 
-def test_transcribe_file_service_error(client, monkeypatch):
-    async def fake_transcribe_audio_chunk(*args, **kwargs):
+    monkeypatch.setattr("src.utils.file_handlers.FileHandler.save_upload_to_temp", fake_save)
+
+    response = await http_client.post(
+        "/api/v1/transcribe/file",
+        files={"file": ("audio.wav", _BigUpload(_TWO_MB), "audio/wav")}
+    )
+
+    assert response.status_code == 413
+    assert saved == []
+
+
+@pytest.mark.asyncio
+async def test_transcribe_file_service_error(http_client, monkeypatch):
+    async def fake_transcribe_audio_path(*args, **kwargs):
         raise RuntimeError("Simulated failure")
 
-    monkeypatch.setattr(transcription_service, "transcribe_audio_chunk", fake_transcribe_audio_chunk)
+    monkeypatch.setattr(transcription_service, "transcribe_audio_path", fake_transcribe_audio_path)
 
     f = io.BytesIO(b"RIFF" + b"00" * 50)
-    response = client.post(
+    response = await http_client.post(
         "/api/v1/transcribe/file",
         files={"file": ("audio.wav", f, "audio/wav")}
     )
     assert response.status_code == 500
+    assert "Simulated failure" in response.json()["detail"]
+
 
 # ---------------------- WEBSOCKET ----------------------
 
-def test_websocket_transcription(monkeypatch):
-    async def fake_transcribe_audio_chunk(audio_chunk, task="transcribe", language=None, sample_rate=16000, channels=1):
+def test_websocket_transcription(client, monkeypatch):
+    async def fake_transcribe_audio_chunk(audio_chunk, task="transcribe", language=None, sample_rate=16000, channels=1, scratch=None):
         return "mocked live text"
 
     monkeypatch.setattr(transcription_service, "transcribe_audio_chunk", fake_transcribe_audio_chunk)
 
-    client = TestClient(app)
+    # Reuses the module's client, whose faked initialize keeps the real model from loading
     with client.websocket_connect("/ws/transcribe") as websocket:
-        audio_data = base64.b64encode(b"RIFF" + b"00" * 10).decode()
-        websocket.send_text(json.dumps({
+        websocket.send_text(orjson.dumps({
             "type": "audio_chunk",
-            "data": audio_data,
+            "data": _RIFF_B64,
             "sample_rate": 16000,
             "channels": 1
-        }))
+        }).decode())
         response = websocket.receive_text()
-        data = json.loads(response)
+        data = orjson.loads(response)
         assert data["type"] == "transcription"
         assert data["text"] == "mocked live text"
 
@@ -0,0 +1,383 @@
+# tests/test_transcription_service.py
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.services.transcription_service import TranscriptionService
+
+
+def make_words(*spec):
+    """Build faster-whisper-like words from (text, start, end) tuples"""
+    return [SimpleNamespace(word=text, start=start, end=end) for text, start, end in spec]
+
+
+class FakeWhisperModel:
+    """Records what the service hands to Whisper.
+
+    With ``hypotheses`` each decode returns the next scripted word list; an
+    exhausted script yields no words rather than raising inside the executor.
+    """
+
+    def __init__(self, text="Olá mundo", hypotheses=None):
+        self.text = text
+        self.hypotheses = iter(hypotheses) if hypotheses is not None else None
+        self.calls = []
+
+    def transcribe(self, audio, **kwargs):
+        self.calls.append((audio, kwargs))
+        if self.hypotheses is None:
+            segment = SimpleNamespace(text=self.text, words=None)
+        else:
+            words = next(self.hypotheses, [])
+            segment = SimpleNamespace(text="".join(w.word for w in words), words=words)
+        segments = iter([segment])  # faster-whisper yields lazily
+        return segments, SimpleNamespace(language="pt", language_probability=0.9, duration=audio.size / 16000)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """Service instance with a fake model, skipping model loading.
+
+    The VAD pre-filter is off so synthetic signals reach the fake model;
+    tests covering the pre-filter turn it back on.
+    """
+    monkeypatch.setattr("src.core.config.settings.VAD_PREFILTER", False)
+    svc = TranscriptionService()
+    svc.model = FakeWhisperModel()
+    svc._initialized = True
+    return svc
+
+
+def test_importing_the_app_defers_faster_whisper():
+    code = "import sys, src.main; print('faster_whisper' in sys.modules or 'ctranslate2' in sys.modules)"
+    root = os.path.dirname(os.path.dirname(__file__))
+
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "False"
+
+
+def test_raw_audio_to_ndarray_mono(service):
+    pcm = np.array([0, 16384, -16384, 32767], dtype=np.int16).tobytes()
+
+    audio = service._raw_audio_to_ndarray(pcm)
+
+    assert audio.dtype == np.float32
+    np.testing.assert_allclose(audio, [0.0, 0.5, -0.5, 32767 / 32768], rtol=1e-6)
+
+
+def test_raw_audio_to_ndarray_stereo_downmix(service):
+    pcm = np.array([16384, 0, -16384, -16384], dtype=np.int16).tobytes()
+
+    audio = service._raw_audio_to_ndarray(pcm, channels=2)
+
+    np.testing.assert_allclose(audio, [0.25, -0.5], rtol=1e-6)
+
+
+def test_raw_audio_to_ndarray_converts_into_scratch(service):
+    pcm = np.array([0, 16384, -16384], dtype=np.int16).tobytes()
+    scratch = np.zeros(8, dtype=np.float32)
+
+    audio = service._raw_audio_to_ndarray(pcm, out=scratch)
+
+    assert np.shares_memory(audio, scratch)
+    np.testing.assert_allclose(audio, [0.0, 0.5, -0.5], rtol=1e-6)
+
+
+def test_raw_audio_to_ndarray_allocates_when_scratch_too_small(service):
+    pcm = np.zeros(16, dtype=np.int16).tobytes()
+    scratch = np.zeros(8, dtype=np.float32)
+
+    audio = service._raw_audio_to_ndarray(pcm, out=scratch)
+
+    assert audio.shape == (16,)
+    assert not np.shares_memory(audio, scratch)
+
+
+def test_raw_audio_to_ndarray_resamples_to_16k(service):
+    pcm = np.zeros(44100, dtype=np.int16).tobytes()  # 1 second at 44.1 kHz
+
+    audio = service._raw_audio_to_ndarray(pcm, sample_rate=44100)
+
+    assert audio.shape == (16000,)
+
+
+@pytest.mark.asyncio
+async def test_transcribe_audio_chunk_passes_ndarray_to_model(service):
+    pcm = (np.sin(np.linspace(0, 100, 16000)) * 10000).astype(np.int16).tobytes()
+
+    text = await service.transcribe_audio_chunk(pcm)
+
+    assert text == "Olá mundo"
+    audio, kwargs = service.model.calls[0]
+    assert isinstance(audio, np.ndarray)
+    assert audio.dtype == np.float32
+    assert audio.shape == (16000,)
+    assert (kwargs["beam_size"], kwargs["temperature"]) == (1, 0.0)  # greedy realtime decode
+
+
+@pytest.mark.asyncio
+async def test_transcribe_audio_chunk_accepts_memoryview(service):
+    frame = b"\x01\x80>\x01" + np.full(16000, 1000, dtype=np.int16).tobytes()
+
+    text = await service.transcribe_audio_chunk(memoryview(frame)[4:])
+
+    assert text == "Olá mundo"
+    audio, _ = service.model.calls[0]
+    assert audio.shape == (16000,)
+
+
+class FakeBatchedPipeline:
+    """Answers each clip with its index so results can be traced back to requests"""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, clip_timestamps, batch_size, **kwargs):
+        self.calls.append((audio, clip_timestamps, batch_size, kwargs))
+        # Returned out of order on purpose; the service maps segments by start time
+        segments = [
+            SimpleNamespace(text=f" clip {i}", start=clip["start"], end=clip["end"])
+            for i, clip in reversed(list(enumerate(clip_timestamps)))
+        ]
+        return iter(segments), SimpleNamespace(language=kwargs["language"])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_chunks_are_decoded_in_one_batch(service):
+    service.batch_pipeline = FakeBatchedPipeline()
+    # Speech fills each synthetic chunk
+    service._speech_timestamps = lambda audio: [{"start": 0, "end": audio.size}]
+    chunks = [np.full(8000 * (i + 1), 1000, dtype=np.int16).tobytes() for i in range(3)]
+
+    results = await asyncio.gather(*(service.transcribe_audio_chunk(c) for c in chunks))
+
+    assert results == ["clip 0", "clip 1", "clip 2"]
+    assert service.model.calls == []  # no per-chunk decode
+    assert service.chunk_batcher.executor is service._pool
+    audio, clips, batch_size, kwargs = service.batch_pipeline.calls[0]
+    assert batch_size == 3
+    assert audio.size == 8000 + 16000 + 24000
+    assert clips == [
+        {"start": 0.0, "end": 0.5},
+        {"start": 0.5, "end": 1.5},
+        {"start": 1.5, "end": 3.0},
+    ]
+    assert kwargs["language"] == "pt"
+    assert kwargs["beam_size"] == 1
+    assert kwargs["no_speech_threshold"] == 0.5  # same settings as an unbatched chunk
+
+
+@pytest.mark.asyncio
+async def test_batched_clips_follow_each_chunks_speech(service):
+    service.batch_pipeline = FakeBatchedPipeline()
+    # The first chunk is silent, the second holds speech between 0.25 s and 0.75 s
+    regions = iter([[], [{"start": 4000, "end": 12000}]])
+    service._speech_timestamps = lambda audio: next(regions)
+    chunks = [np.full(16000, 1000, dtype=np.int16).tobytes() for _ in range(2)]
+
+    results = await asyncio.gather(*(service.transcribe_audio_chunk(c) for c in chunks))
+
+    assert results == ["", "clip 0"]
+    _, clips, batch_size, _ = service.batch_pipeline.calls[0]
+    assert clips == [{"start": 1.25, "end": 1.75}]
+    assert batch_size == 1
+
+
+@pytest.mark.asyncio
+async def test_single_chunk_skips_batched_pipeline(service):
+    service.batch_pipeline = FakeBatchedPipeline()
+    pcm = np.full(16000, 1000, dtype=np.int16).tobytes()
+
+    text = await service.transcribe_audio_chunk(pcm)
+
+    assert text == "Olá mundo"
+    assert service.batch_pipeline.calls == []
+    assert len(service.model.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_transcribe_audio_chunk_too_small(service):
+    text = await service.transcribe_audio_chunk(b"\x00\x01" * 10)
+
+    assert text == ""
+    assert service.model.calls == []
+
+
+@pytest.mark.asyncio
+async def test_transcribe_audio_chunk_decodes_formatted_audio(service, ogg_bytes):
+    text = await service.transcribe_audio_chunk(ogg_bytes)
+
+    assert text == "Olá mundo"
+    audio, _ = service.model.calls[0]
+    assert isinstance(audio, np.ndarray)
+    assert audio.dtype == np.float32
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("magic", [b"RIFF", b"OggS", b"ID3\x03", b"fLaC", b"\x1aE\xdf\xa3"])
+async def test_transcribe_audio_chunk_routes_containers_to_decoder(service, monkeypatch, magic):
+    decoded = []
+
+    async def fake_decode(data):
+        decoded.append(data)
+        return np.zeros(16000, dtype=np.float32)
+
+    monkeypatch.setattr(service.audio_converter, "decode_audio", fake_decode)
+
+    await service.transcribe_audio_chunk(magic + b"\x00" * 64)
+
+    assert decoded == [magic + b"\x00" * 64]
+
+
+@pytest.mark.asyncio
+async def test_transcribe_audio_file_decodes_in_memory(service, ogg_bytes, tmp_path, monkeypatch):
+    monkeypatch.setattr("src.core.config.settings.TEMP_UPLOAD_DIR", str(tmp_path))
+
+    result = await service.transcribe_audio_file(ogg_bytes, task="transcribe")
+
+    assert result.text == "Olá mundo"
+    assert result.language == "pt"
+    assert result.duration > 0
+    audio, kwargs = service.model.calls[0]
+    assert isinstance(audio, np.ndarray)
+    assert kwargs["task"] == "transcribe"
+    assert kwargs["beam_size"] == 5  # files keep the beam search
+    assert list(tmp_path.iterdir()) == []  # nothing spilled to disk
+
+
+@pytest.mark.asyncio
+async def test_transcribe_async_drains_segments_off_the_event_loop(service):
+    threads = []
+
+    def lazy_segments():
+        threads.append(threading.current_thread())
+        yield SimpleNamespace(text="Olá")
+
+    service.model.transcribe = lambda audio, **kwargs: (lazy_segments(), SimpleNamespace(language="pt"))
+
+    segments, info = await service.transcribe_async(np.zeros(16000, dtype=np.float32))
+
+    assert [s.text for s in segments] == ["Olá"]
+    assert threads and threads[0] is not threading.current_thread()
+    assert threads[0].name.startswith("whisper")  # dedicated pool, not the default executor
+
+
+@pytest.mark.asyncio
+async def test_vad_prefilter_skips_silent_chunks(service, monkeypatch):
+    monkeypatch.setattr("src.core.config.settings.VAD_PREFILTER", True)
+    silence = np.zeros(16000, dtype=np.int16).tobytes()
+
+    text = await service.transcribe_audio_chunk(silence)
+
+    assert text == ""
+    assert service.model.calls == []
+
+
+@pytest.mark.asyncio
+async def test_vad_prefilter_hands_its_speech_to_the_decode(service, monkeypatch):
+    monkeypatch.setattr("src.core.config.settings.VAD_PREFILTER", True)
+    threads = []
+
+    def fake_speech_timestamps(audio):
+        threads.append(threading.current_thread())
+        return [{"start": 4000, "end": 12000}]
+
+    service._speech_timestamps = fake_speech_timestamps
+    pcm = np.full(16000, 1000, dtype=np.int16).tobytes()
+
+    text = await service.transcribe_audio_chunk(pcm)
+
+    assert text == "Olá mundo"
+    assert len(threads) == 1  # one VAD pass per chunk
+    assert threads[0].name.startswith("whisper")
+    audio, kwargs = service.model.calls[0]
+    assert audio.shape == (8000,)  # only the speech is decoded
+    assert kwargs["vad_filter"] is False
+
+
+@pytest.mark.asyncio
+async def test_vad_prefilter_detects_speech(service, ogg_bytes, monkeypatch):
+    monkeypatch.setattr("src.core.config.settings.VAD_PREFILTER", True)
+    speech = await service.audio_converter.decode_audio(ogg_bytes)
+
+    assert await service._has_speech(speech)
+    assert not await service._has_speech(np.zeros_like(speech))
+
+
+async def pcm_stream(seconds):
+    """Yield one second of silent 16 kHz PCM per chunk"""
+    one_second = np.zeros(16000, dtype=np.int16).tobytes()
+    for _ in range(seconds):
+        yield one_second
+
+
+@pytest.mark.asyncio
+async def test_process_realtime_stream_emits_agreed_words(service):
+    service.model = FakeWhisperModel(hypotheses=[
+        make_words((" Teste", 0.0, 0.6)),
+        make_words((" Teste", 0.0, 0.6), (" de", 0.6, 0.9)),
+        make_words((" de", 0.0, 0.3), (" transcrição", 0.3, 1.2)),
+        make_words((" transcrição", 0.0, 0.9)),  # final tail flushed at stream end
+    ])
+
+    results = [text async for text in service.process_realtime_stream(pcm_stream(3))]
+
+    assert results == ["Teste", "de", "transcrição"]
+    # Each decode only covers audio that has not been committed yet
+    audio_sizes = [audio.size for audio, _ in service.model.calls]
+    assert audio_sizes == [16000, 32000, 38400, 33600]
+    assert all(kwargs["beam_size"] == 1 for _, kwargs in service.model.calls)
+
+
+@pytest.mark.asyncio
+async def test_process_realtime_stream_keeps_hypothesis_when_decode_fails(service):
+    service.model = FakeWhisperModel(hypotheses=[
+        make_words((" Olá", 0.0, 0.5)),
+        make_words((" Olá", 0.0, 0.5), (" mundo", 0.5, 0.9)),
+    ])
+    original_transcribe = service.model.transcribe
+    attempts = []
+
+    def flaky_transcribe(audio, **kwargs):
+        attempts.append(audio.size)
+        if len(attempts) == 2:
+            raise RuntimeError("decoder hiccup")
+        return original_transcribe(audio, **kwargs)
+
+    service.model.transcribe = flaky_transcribe
+
+    results = [text async for text in service.process_realtime_stream(pcm_stream(3))]
+
+    # The failed decode neither commits nor forgets the first hypothesis
+    assert results == ["Olá"]
+    assert len(attempts) == 4
+
+
+@pytest.mark.asyncio
+async def test_process_realtime_stream_commits_when_speech_ends(service):
+    service.model = FakeWhisperModel(hypotheses=[
+        make_words((" Olá", 0.0, 0.5)),
+        make_words((" Olá", 0.0, 0.5), (" mundo", 0.5, 0.9)),
+        make_words((" mundo", 0.0, 0.4)),
+    ])
+    speech_flags = iter([True, True, False, False])
+
+    async def scripted_vad(audio):
+        return next(speech_flags)
+
+    service._has_speech = scripted_vad
+
+    results = [text async for text in service.process_realtime_stream(pcm_stream(4))]
+
+    # "mundo" is committed on the speech-to-silence transition without a second agreeing decode
+    assert results == ["Olá", "mundo"]
+    # The trailing silence is dropped instead of being decoded
+    audio_sizes = [audio.size for audio, _ in service.model.calls]
+    assert audio_sizes == [16000, 32000, 40000]
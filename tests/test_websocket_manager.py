@@ -0,0 +1,47 @@
+# tests/test_websocket_manager.py
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+import orjson
+import pytest
+
+from src.models.schemas import WebSocketMessage
+from src.services.websocket_manager import ConnectionManager
+
+
+@pytest.mark.asyncio
+async def test_send_message_serializes_timestamp():
+    manager = ConnectionManager()
+    websocket = AsyncMock()
+    await manager.connect(websocket, "client-1")
+
+    message = WebSocketMessage(
+        type="transcription",
+        data={"text": "Olá"},
+        timestamp=datetime(2024, 1, 2, 3, 4, 5)
+    )
+    await manager.send_message(websocket, message)
+
+    payload = orjson.loads(websocket.send_text.call_args.args[0])
+    assert payload == {
+        "type": "transcription",
+        "data": {"text": "Olá"},
+        "timestamp": "2024-01-02T03:04:05"
+    }
+    assert websocket in manager.active_connections
+
+
+@pytest.mark.asyncio
+async def test_broadcast_drops_failed_connections():
+    manager = ConnectionManager()
+    healthy, broken = AsyncMock(), AsyncMock()
+    broken.send_text.side_effect = RuntimeError("connection reset")
+    await manager.connect(healthy, "healthy")
+    await manager.connect(broken, "broken")
+
+    message = WebSocketMessage(type="transcription", data={"text": "Olá"}, timestamp=datetime.now())
+    await manager.broadcast(message)
+
+    healthy.send_text.assert_called_once()
+    assert manager.active_connections == {healthy}
+    assert broken not in manager.connection_data
@@ -1,30 +1,13 @@
 # tests/test_websocket_real_audio.py
-import base64
-import json
-import os
-from unittest.mock import AsyncMock, patch
+import struct
+from unittest.mock import ANY, AsyncMock, patch
 
+import orjson
 import pytest
-from fastapi.testclient import TestClient
 
-from src.main import app
 
-
-@pytest.fixture
-def client():
-    """Test client fixture"""
-    return TestClient(app)
-
-
-@pytest.fixture
-def real_audio_data():
-    """Load real audio file for testing"""
-    audio_path = os.path.join(os.path.dirname(__file__), "data", "teste.ogg")
-    if not os.path.exists(audio_path):
-        pytest.skip(f"Audio file not found: {audio_path}")
-
-    with open(audio_path, "rb") as audio_file:
-        return audio_file.read()
+# Binary audio frame header (type 0x01, 16 kHz, mono); the OGG bytes follow without base64 or JSON
+AUDIO_FRAME_HEADER = struct.pack("<BHB", 0x01, 16000, 1)
 
 
 @pytest.fixture(autouse=True)
@@ -36,29 +19,19 @@ def patch_manager():
         yield
 
 
-@pytest.mark.asyncio
-async def test_websocket_real_audio_transcription(client, real_audio_data):
+def test_websocket_real_audio_transcription(client, ogg_bytes):
     """Test WebSocket with real audio file containing 'Teste de transcrição'"""
     with patch('src.routes.websocket.transcription_service') as mock_service:
         mock_service.initialize = AsyncMock()
         mock_service.transcribe_audio_chunk = AsyncMock(return_value="Teste de transcrição")
 
         with client.websocket_connect("/ws/transcribe") as websocket:
-            # Encode real audio data to base64
-            audio_b64 = base64.b64encode(real_audio_data).decode('utf-8')
-
-            # Send audio chunk message
-            audio_message = {
-                "type": "audio_chunk",
-                "data": audio_b64,
-                "sample_rate": 16000,
-                "channels": 1
-            }
-            websocket.send_text(json.dumps(audio_message))
+            # Send the real audio as one binary frame
+            websocket.send_bytes(AUDIO_FRAME_HEADER + ogg_bytes)
 
             # Receive and verify transcription response
             response = websocket.receive_text()
-            response_data = json.loads(response)
+            response_data = orjson.loads(response)
 
             assert response_data["type"] == "transcription"
             assert response_data["text"] == "Teste de transcrição"
@@ -66,50 +39,49 @@ async def test_websocket_real_audio_transcription(client, real_audio_data):
 
             # Verify service was called with the real audio data
             mock_service.transcribe_audio_chunk.assert_called_once_with(
-                real_audio_data,
+                ogg_bytes,
                 sample_rate=16000,
-                channels=1
+                channels=1,
+                scratch=ANY
             )
 
 
-@pytest.mark.asyncio
-async def test_websocket_real_audio_multiple_chunks(client, real_audio_data):
+def test_websocket_real_audio_multiple_chunks(client, ogg_bytes):
     """Test WebSocket with multiple chunks of real audio data"""
     with patch('src.routes.websocket.transcription_service') as mock_service:
         mock_service.initialize = AsyncMock()
         # Simulate different transcriptions for different chunks
-        mock_service.transcribe_audio_chunk = AsyncMock(
-            side_effect=["Teste de", "transcrição", "completo"]
-        )
+        calls = []
+        replies = iter(["Teste de", "transcrição", "completo"])
+
+        async def fake_transcribe_audio_chunk(*args, **kwargs):
+            calls.append((args, kwargs))
+            return next(replies)
+
+        mock_service.transcribe_audio_chunk = fake_transcribe_audio_chunk
+
+        # Split audio data into chunks (simulating real-time streaming) and frame each once
+        chunk_size = len(ogg_bytes) // 3
+        chunks = [
+            ogg_bytes[i:i + chunk_size]
+            for i in range(0, len(ogg_bytes), chunk_size)
+        ][:3]  # Take first 3 chunks
+        frames = [AUDIO_FRAME_HEADER + chunk for chunk in chunks]
+
+        expected_transcriptions = ["Teste de", "transcrição", "completo"]
 
         with client.websocket_connect("/ws/transcribe") as websocket:
-            # Split audio data into chunks (simulating real-time streaming)
-            chunk_size = len(real_audio_data) // 3
-            chunks = [
-                real_audio_data[i:i + chunk_size]
-                for i in range(0, len(real_audio_data), chunk_size)
-            ][:3]  # Take first 3 chunks
-
-            expected_transcriptions = ["Teste de", "transcrição", "completo"]
-
-            for i, chunk in enumerate(chunks):
-                audio_b64 = base64.b64encode(chunk).decode('utf-8')
-
-                audio_message = {
-                    "type": "audio_chunk",
-                    "data": audio_b64,
-                    "sample_rate": 16000,
-                    "channels": 1
-                }
-                websocket.send_text(json.dumps(audio_message))
-
-                # Receive response for each chunk
-                response = websocket.receive_text()
-                response_data = json.loads(response)
+            # Queue every chunk before reading; the server answers them in order
+            for frame in frames:
+                websocket.send_bytes(frame)
+
+            for expected in expected_transcriptions:
+                response_data = orjson.loads(websocket.receive_text())
 
                 assert response_data["type"] == "transcription"
-                assert response_data["text"] == expected_transcriptions[i]
+                assert response_data["text"] == expected
                 assert "timestamp" in response_data
 
             # Verify all chunks were processed
-            assert mock_service.transcribe_audio_chunk.call_count == 3
\ No newline at end of file
+            assert len(calls) == 3
+            assert calls[0][1]["sample_rate"] == 16000
\ No newline at end of file